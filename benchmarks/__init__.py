@@ -0,0 +1,3 @@
+"""
+Benchmarks for storage backends and other hot paths of the bot.
+"""
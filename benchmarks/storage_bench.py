@@ -0,0 +1,291 @@
+"""
+Storage benchmark with synthetic users and lists.
+
+Usage::
+
+    python -m benchmarks.storage_bench --backend memory --output bench.json
+    python -m benchmarks.storage_bench --backend postgres --sizes 10,1000 --concurrency 1,16
+
+For every list size and image variant the suite seeds fresh users, then drives
+each operation at every concurrency level and reports p50/p95/p99 latency and
+throughput as JSON. Postgres runs use the regular PG* settings and an id range
+far above real Telegram ids; the synthetic rows are deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from core.memory_storage import InMemoryStorage
+from core.models import Wish
+from core.storage_protocol import StorageProtocol
+
+SYNTHETIC_USER_BASE = 9_000_000_000_000
+DEFAULT_SIZES = "10,100,1000,10000"
+DEFAULT_CONCURRENCY = "1,8,32"
+DEFAULT_OPERATIONS = "list_wishes,list_wishes_page,find_wish,patch_wish,is_session_active,search_wishes,load_wish_image"
+_CATEGORIES = ["Техника", "Книги", "Дом", "Спорт", "Путешествия", None]
+_WORDS = ["наушники", "книга", "кофе", "рюкзак", "lamp", "keyboard", "кроссовки", "игра", "plant", "чайник"]
+
+
+@dataclass(slots=True)
+class Scenario:
+    list_size: int
+    images: bool
+    user_ids: list[int]
+    wish_ids: dict[int, list[int]]
+
+
+@dataclass(slots=True)
+class BenchResult:
+    operation: str
+    list_size: int
+    images: bool
+    concurrency: int
+    count: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    throughput_ops: float
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def _synthetic_wish(rng: random.Random, index: int) -> Wish:
+    words = rng.sample(_WORDS, 2)
+    return Wish(
+        title=f"{words[0].capitalize()} {index}",
+        link=f"https://example.com/item/{index}" if index % 2 else None,
+        category=rng.choice(_CATEGORIES),
+        description=f"{words[1]} для теста" if index % 3 else None,
+        priority=rng.randint(1, 5),
+    )
+
+
+async def _seed(
+    storage: StorageProtocol,
+    rng: random.Random,
+    first_user_id: int,
+    users: int,
+    list_size: int,
+    image: Optional[bytes],
+) -> Scenario:
+    user_ids = [first_user_id + offset for offset in range(users)]
+    wish_ids: dict[int, list[int]] = {}
+    for user_id in user_ids:
+        await storage.mark_session_active(user_id)
+        image_hash = None
+        remaining = list_size
+        if image is not None and remaining:
+            # One upload registers the blob; the rest reference the same hash,
+            # which is what the blob store deduplicates identical photos into.
+            first = _synthetic_wish(rng, 0)
+            first.image = image
+            await storage.add_wish(user_id, first)
+            image_hash = first.image_hash
+            remaining -= 1
+        wishes = [_synthetic_wish(rng, index) for index in range(1, remaining + 1)]
+        for wish in wishes:
+            wish.image_hash = image_hash
+        await storage.add_wishes_bulk(user_id, wishes)
+        wish_ids[user_id] = [int(wish.id) for wish in await storage.list_wishes(user_id)]
+    return Scenario(list_size=list_size, images=image is not None, user_ids=user_ids, wish_ids=wish_ids)
+
+
+def _operations(storage: StorageProtocol) -> dict[str, Callable[[int, int, random.Random], Awaitable[Any]]]:
+    return {
+        "list_wishes": lambda user_id, wish_id, rng: storage.list_wishes(user_id),
+        "list_wishes_page": lambda user_id, wish_id, rng: storage.list_wishes_page(user_id),
+        "find_wish": lambda user_id, wish_id, rng: storage.find_wish(user_id, wish_id),
+        "patch_wish": lambda user_id, wish_id, rng: storage.patch_wish(user_id, wish_id, priority=rng.randint(1, 5)),
+        "is_session_active": lambda user_id, wish_id, rng: storage.is_session_active(user_id),
+        "search_wishes": lambda user_id, wish_id, rng: storage.search_wishes(user_id, rng.choice(_WORDS)[:4]),
+        "load_wish_image": lambda user_id, wish_id, rng: storage.load_wish_image(user_id, wish_id),
+    }
+
+
+async def _drive(
+    name: str,
+    call: Callable[[int, int, random.Random], Awaitable[Any]],
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    rng: random.Random,
+) -> BenchResult:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            user_id = rng.choice(scenario.user_ids)
+            wish_id = rng.choice(scenario.wish_ids[user_id])
+            started = time.perf_counter()
+            try:
+                await call(user_id, wish_id, rng)
+            except Exception as exc:  # pragma: no cover - reported in the JSON instead
+                errors += 1
+                logging.debug("%s failed: %s", name, exc)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = 1000.0
+    return BenchResult(
+        operation=name,
+        list_size=scenario.list_size,
+        images=scenario.images,
+        concurrency=concurrency,
+        count=len(latencies),
+        errors=errors,
+        p50_ms=round(_percentile(latencies, 50) * to_ms, 4),
+        p95_ms=round(_percentile(latencies, 95) * to_ms, 4),
+        p99_ms=round(_percentile(latencies, 99) * to_ms, 4),
+        mean_ms=round(sum(latencies) / len(latencies) * to_ms, 4) if latencies else 0.0,
+        max_ms=round(latencies[-1] * to_ms, 4) if latencies else 0.0,
+        throughput_ops=round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+    )
+
+
+async def _open_postgres(args: argparse.Namespace) -> tuple[StorageProtocol, Callable[[], Awaitable[None]]]:
+    from core.blob_store import BlobStore
+    from core.config import build_db_config
+    from core.database_setup import run_migrations
+    from core.pool import InstrumentedPool
+    from core.storage import Storage
+
+    pool = await InstrumentedPool(build_db_config(), name="bench").start()
+    await run_migrations(pool)
+    blob_dir = tempfile.TemporaryDirectory(prefix="wish-bench-")
+    cache_kwargs: dict[str, Any] = {}
+    if args.no_cache:
+        cache_kwargs = {"session_cache_ttl": 0.0, "wish_cache_ttl": 0.0}
+    storage = Storage(pool, blob_store=BlobStore(blob_dir.name), **cache_kwargs)
+
+    async def close() -> None:
+        async with pool.acquire() as conn:
+            await conn.execute("DELETE FROM wishes WHERE user_id >= $1", SYNTHETIC_USER_BASE)
+            await conn.execute("DELETE FROM user_sessions WHERE user_id >= $1", SYNTHETIC_USER_BASE)
+        logging.info("Pool during benchmark: %s", pool.stats.as_dict())
+        await pool.close()
+        blob_dir.cleanup()
+
+    return storage, close
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    concurrency_levels = [int(value) for value in args.concurrency.split(",") if value]
+    variants = {"none": [False], "with": [True], "both": [False, True]}[args.images]
+    image = rng.randbytes(args.image_kb * 1024)
+
+    if args.backend == "postgres":
+        storage, close = await _open_postgres(args)
+    else:
+        storage, close = InMemoryStorage(), None
+
+    operations = _operations(storage)
+    selected = [name.strip() for name in args.operations.split(",") if name.strip()]
+    unknown = set(selected) - set(operations)
+    if unknown:
+        raise SystemExit(f"Unknown operations: {', '.join(sorted(unknown))}")
+
+    results: list[BenchResult] = []
+    next_user_id = SYNTHETIC_USER_BASE
+    try:
+        for list_size in sizes:
+            for with_images in variants:
+                scenario = await _seed(
+                    storage,
+                    rng,
+                    next_user_id,
+                    args.users,
+                    list_size,
+                    image if with_images else None,
+                )
+                next_user_id += args.users
+                for name in selected:
+                    for concurrency in concurrency_levels:
+                        result = await _drive(name, operations[name], scenario, concurrency, args.requests, rng)
+                        logging.info(
+                            "%-18s size=%-6s images=%-5s c=%-3s p50=%.3fms p99=%.3fms %.0f ops/s",
+                            name,
+                            list_size,
+                            with_images,
+                            concurrency,
+                            result.p50_ms,
+                            result.p99_ms,
+                            result.throughput_ops,
+                        )
+                        results.append(result)
+    finally:
+        if close is not None:
+            await close()
+
+    return {
+        "meta": {
+            "backend": args.backend,
+            "cache": not args.no_cache,
+            "users_per_size": args.users,
+            "requests_per_run": args.requests,
+            "image_kb": args.image_kb,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк Storage на синтетических списках желаний.")
+    parser.add_argument("--backend", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="размеры списков через запятую")
+    parser.add_argument("--users", type=int, default=3, help="пользователей на каждый размер списка")
+    parser.add_argument("--images", choices=["none", "with", "both"], default="both")
+    parser.add_argument("--image-kb", type=int, default=256)
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="уровни параллелизма через запятую")
+    parser.add_argument("--requests", type=int, default=500, help="запросов на каждый прогон")
+    parser.add_argument("--operations", default=DEFAULT_OPERATIONS)
+    parser.add_argument("--no-cache", action="store_true", help="отключить кэши Storage (только postgres)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="файл для JSON-отчёта; по умолчанию stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    report = asyncio.run(run_benchmark(args))
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,113 @@
+import logging
+
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, InlineKeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
-from bot.shared_utils import describe_wish_for_confirmation, ensure_active_session, get_storage, send_wish_list
-from ui.keyboards import main_menu_keyboard
+from bot.message_registry import can_delete, message_registry
+from bot.shared_utils import (
+    CardRef,
+    describe_wish_for_confirmation,
+    edit_card_in_place,
+    edit_markup_in_place,
+    ensure_active_session,
+    get_storage,
+)
+from core.config import EDIT_IN_PLACE
+from ui.keyboards import (
+    build_delete_confirm_keyboard,
+    build_wish_actions_keyboard,
+    main_menu_keyboard,
+    wish_ids_in_keyboard,
+)
 
 router = Router()
 
+DELETED_STUB_TEXT = "🗑️ Удалено"
+
+
+def _without_wish(markup: InlineKeyboardMarkup, wish_id: int) -> InlineKeyboardMarkup:
+    rows = [
+        row
+        for row in markup.inline_keyboard
+        if wish_ids_in_keyboard(InlineKeyboardMarkup(inline_keyboard=[row])) != {wish_id}
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+async def _strip_shared_keyboards(callback: CallbackQuery, wish_id: int) -> None:
+    """Drop the deleted wish's buttons from every known message that also acts on other wishes."""
+    message = callback.message
+    chat_id = message.chat.id
+    recorded = message_registry.pop_shared(chat_id, wish_id)
+    shared = dict(recorded)
+    if isinstance(message, Message) and len(wish_ids_in_keyboard(message.reply_markup)) > 1:
+        # The pressed message's own keyboard is current; a recorded copy may be stale.
+        shared[message.message_id] = message.reply_markup
+    for message_id, markup in shared.items():
+        remaining = _without_wish(markup, wish_id)
+        target = CardRef(chat_id=chat_id, message_id=message_id, is_photo=False)
+        # Compact pages are re-rendered on paging, so only registered messages stay tracked.
+        if await edit_markup_in_place(callback.bot, target, remaining) and message_id in recorded:
+            message_registry.record_shared(chat_id, message_id, wish_ids_in_keyboard(remaining), remaining)
+
+
+async def _remove_wish_messages(callback: CallbackQuery, wish_id: int) -> None:
+    """
+    Reflect a deletion in the chat without re-sending the list.
+
+    Messages known to show only this wish (plus the card or prompt the button
+    sits on) are deleted in one call; messages shared with other wishes only
+    lose the deleted wish's buttons. deleteMessages silently skips messages
+    older than 48 hours, so those only lose their keyboard, and the pressed
+    message becomes a stub when it cannot be deleted or when nothing else
+    about the wish is known (the registry is in-process only).
+    """
+    message = callback.message
+    chat_id = message.chat.id
+    await _strip_shared_keyboards(callback, wish_id)
+
+    known = message_registry.pop(chat_id, wish_id)
+    to_delete = [message_id for message_id, sent_at in known if can_delete(sent_at)]
+    too_old = [message_id for message_id, sent_at in known if not can_delete(sent_at)]
+    stub_pressed = False
+    if isinstance(message, Message) and wish_ids_in_keyboard(message.reply_markup) == {wish_id}:
+        for ids in (to_delete, too_old):
+            if message.message_id in ids:
+                ids.remove(message.message_id)
+        if known and can_delete(message.date.timestamp()):
+            to_delete.append(message.message_id)
+        else:
+            stub_pressed = True
+
+    if to_delete:
+        try:
+            await callback.bot.delete_messages(chat_id, to_delete)
+        except TelegramBadRequest as exc:
+            logging.info("Cannot delete cards of wish %s: %s", wish_id, exc)
+            stub_pressed = stub_pressed or message.message_id in to_delete
+            too_old.extend(message_id for message_id in to_delete if message_id != message.message_id)
+    for message_id in too_old:
+        target = CardRef(chat_id=chat_id, message_id=message_id, is_photo=False)
+        await edit_markup_in_place(callback.bot, target, None)
+
+    if stub_pressed:
+        card = _card_in_callback(callback, wish_id)
+        if card is None or not await edit_card_in_place(callback.bot, card, DELETED_STUB_TEXT):
+            pressed = CardRef.from_message(message)
+            if pressed is not None:
+                await edit_markup_in_place(callback.bot, pressed, None)
+            await callback.message.answer(DELETED_STUB_TEXT, reply_markup=main_menu_keyboard())
+
+
+def _card_in_callback(callback: CallbackQuery, wish_id: int) -> CardRef | None:
+    if not EDIT_IN_PLACE or not isinstance(callback.message, Message):
+        return None
+    if wish_ids_in_keyboard(callback.message.reply_markup) != {wish_id}:
+        return None
+    return CardRef.from_message(callback.message)
+
 
 @router.callback_query(F.data.startswith("delete:"))
 @ensure_active_session
@@ -25,15 +125,18 @@ async def callback_delete(callback: CallbackQuery, state: FSMContext) -> None:
         await callback.answer("⚠️ Элемент не найден", show_alert=True)
         return
 
-    builder = InlineKeyboardBuilder()
-    builder.row(
-        InlineKeyboardButton(text="✅ Удалить", callback_data=f"delete_confirm:{wish_id}"),
-        InlineKeyboardButton(text="⬅️ Назад", callback_data="cancel"),
-    )
+    card = _card_in_callback(callback, wish_id)
+    if card is not None and await edit_markup_in_place(
+        callback.bot,
+        card,
+        build_delete_confirm_keyboard(wish_id, in_place=True),
+    ):
+        await callback.answer("❌ Удалить это желание?")
+        return
 
     await callback.message.answer(
         "❌ Удалить это желание?\n\n" f"{describe_wish_for_confirmation(wish)}",
-        reply_markup=builder.as_markup(),
+        reply_markup=build_delete_confirm_keyboard(wish_id),
     )
     await callback.answer()
 
@@ -44,6 +147,16 @@ async def callback_cancel(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("↩️ Отмена")
 
 
+@router.callback_query(F.data.startswith("delete_cancel:"))
+@ensure_active_session
+async def callback_delete_cancel(callback: CallbackQuery, state: FSMContext) -> None:
+    payload = callback.data.split(":", 1)[1]
+    card = CardRef.from_message(callback.message)
+    if payload.isdigit() and card is not None:
+        await edit_markup_in_place(callback.bot, card, build_wish_actions_keyboard(int(payload)))
+    await callback.answer("↩️ Отмена")
+
+
 @router.callback_query(F.data.startswith("delete_confirm:"))
 @ensure_active_session
 async def callback_delete_confirm(callback: CallbackQuery, state: FSMContext) -> None:
@@ -60,11 +173,5 @@ async def callback_delete_confirm(callback: CallbackQuery, state: FSMContext) ->
         await callback.answer("⚠️ Не удалось удалить", show_alert=True)
         return
 
-    await callback.message.answer("🗑️ Удалено", reply_markup=main_menu_keyboard())
-    wishes = await storage.list_wishes(callback.from_user.id)
-    await send_wish_list(
-        callback.message,
-        wishes,
-        "📭 Список пуст. Нажмите «➕ Добавить».",
-    )
-    await callback.answer()
+    await _remove_wish_messages(callback, wish_id)
+    await callback.answer(DELETED_STUB_TEXT)
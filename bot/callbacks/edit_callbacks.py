@@ -7,16 +7,22 @@ from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message, PhotoSize
-from aiogram.types.input_file import BufferedInputFile
 
 from bot.fsm import EditWish, UserSession
 from bot.shared_utils import (
+    CardRef,
+    MappedInputFile,
     describe_wish_for_confirmation,
+    edit_card_in_place,
+    edit_markup_in_place,
     ensure_active_session,
     ensure_authorized,
     get_storage,
-    send_wish_list,
+    register_wish_messages,
+    remember_uploaded_photo,
+    send_wish_page,
 )
+from core.config import EDIT_IN_PLACE
 from core.models import Wish
 from ui.keyboards import (
     build_edit_menu,
@@ -24,11 +30,13 @@ from ui.keyboards import (
     build_priority_menu,
     cancel_input_keyboard,
     main_menu_keyboard,
+    wish_ids_in_keyboard,
 )
 
 router = Router()
 
 MAX_DOWNLOAD_SIZE = 10 * 1024 * 1024
+MAX_TITLE_LENGTH = 120
 
 
 @dataclass(frozen=True)
@@ -73,27 +81,61 @@ async def _load_wish_or_warn(callback: CallbackQuery, wish_id: int) -> Optional[
     return wish
 
 
-async def _show_edit_card(message: Message, wish: Wish) -> None:
+def _card_in_callback(callback: CallbackQuery, wish_id: int) -> Optional[CardRef]:
+    """The message the button was pressed on, if it is a card of this wish alone and may be edited."""
+    if not EDIT_IN_PLACE or not isinstance(callback.message, Message):
+        return None
+    markup = callback.message.reply_markup
+    if wish_ids_in_keyboard(markup) != {wish_id}:
+        return None
+    if any((button.callback_data or "").startswith("list:") for row in markup.inline_keyboard for button in row):
+        # A compact list page that happens to hold one wish is still a list, not a card.
+        return None
+    return CardRef.from_message(callback.message)
+
+
+async def _card_in_state(state: FSMContext) -> Optional[CardRef]:
+    if not EDIT_IN_PLACE:
+        return None
+    return CardRef.from_state(await state.get_data())
+
+
+async def _show_edit_card(
+    message: Message,
+    wish: Wish,
+    *,
+    card: Optional[CardRef] = None,
+    replace_photo: bool = False,
+) -> None:
     caption = describe_wish_for_confirmation(wish)
-    has_photo = bool(wish.image_url or wish.image)
+    has_photo = bool(wish.image_url or wish.has_image)
     markup = build_edit_menu(int(wish.id), has_photo=has_photo)
+    if card is not None and message.bot is not None and card.is_photo == has_photo:
+        photo = wish.image_url if replace_photo else None
+        if await edit_card_in_place(message.bot, card, caption, markup, photo=photo):
+            return
     if wish.image_url:
         try:
-            await message.answer_photo(wish.image_url, caption=caption, reply_markup=markup)
-            return
+            sent = await message.answer_photo(wish.image_url, caption=caption, reply_markup=markup)
         except TelegramBadRequest:
             pass
-    if wish.image:
-        try:
-            await message.answer_photo(
-                BufferedInputFile(bytes(wish.image), filename=f"wish-{wish.id}.jpg"),
-                caption=caption,
-                reply_markup=markup,
-            )
+        else:
+            register_wish_messages(wish, [sent])
             return
+    image = None
+    if wish.has_image and wish.user_id is not None:
+        image = await get_storage().load_wish_image(wish.user_id, int(wish.id))
+    if image:
+        upload = MappedInputFile(image, filename=f"wish-{wish.id}.jpg")
+        try:
+            sent = await message.answer_photo(upload, caption=caption, reply_markup=markup)
         except TelegramBadRequest:
             pass
-    await message.answer(caption, reply_markup=markup)
+        else:
+            await remember_uploaded_photo(wish, upload, sent)
+            register_wish_messages(wish, [sent])
+            return
+    register_wish_messages(wish, [await message.answer(caption, reply_markup=markup)])
 
 
 def _largest_photo(photos: list[PhotoSize]) -> PhotoSize:
@@ -111,10 +153,10 @@ async def _download_photo_if_needed(message: Message, photo: PhotoSize) -> bytes
 @ensure_active_session
 async def handle_back_to_list(callback: CallbackQuery, state: FSMContext) -> None:
     storage = get_storage()
-    wishes = await storage.list_wishes(callback.from_user.id)
-    await send_wish_list(
+    page = await storage.list_wishes_page(callback.from_user.id)
+    await send_wish_page(
         callback.message,
-        wishes,
+        page,
         "📭 Список пуст. Нажмите «➕ Добавить».",
     )
     await callback.answer()
@@ -128,16 +170,27 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
         await callback.answer("⚠️ Неизвестное действие", show_alert=True)
         return
 
-    wish = await _load_wish_or_warn(callback, parsed.item_id)
-    if wish is None:
-        return
+    # Writes go straight to patch_wish, which returns None for a missing wish itself.
+    writes_directly = parsed.action in {"priority|set", "photo|clear"} or (
+        parsed.action == "url" and parsed.value == "clear"
+    )
+    wish: Optional[Wish] = None
+    if not writes_directly:
+        wish = await _load_wish_or_warn(callback, parsed.item_id)
+        if wish is None:
+            return
+
+    card = _card_in_callback(callback, parsed.item_id)
 
     if parsed.action == "card":
-        await _show_edit_card(callback.message, wish)
+        await _show_edit_card(callback.message, wish, card=card)
         await callback.answer()
         return
 
     if parsed.action == "priority":
+        if card is not None and await edit_markup_in_place(callback.bot, card, build_priority_menu(parsed.item_id)):
+            await callback.answer("⭐ Выберите приоритет")
+            return
         await callback.message.answer(
             "⭐ Выберите приоритет",
             reply_markup=build_priority_menu(parsed.item_id),
@@ -153,10 +206,14 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
         if priority < 1 or priority > 5:
             await callback.answer("⚠️ Диапазон 1–5", show_alert=True)
             return
-        updated = await get_storage().update_wish_priority(callback.from_user.id, parsed.item_id, priority)
+        updated = await get_storage().patch_wish(callback.from_user.id, parsed.item_id, priority=priority)
         if updated is None:
             await callback.answer("⚠️ Не удалось обновить", show_alert=True)
             return
+        if card is not None:
+            await _show_edit_card(callback.message, updated, card=card)
+            await callback.answer("✅ Приоритет обновлён")
+            return
         await callback.message.answer("✅ Приоритет обновлён", reply_markup=main_menu_keyboard())
         await _show_edit_card(callback.message, updated)
         await callback.answer()
@@ -164,7 +221,7 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
 
     if parsed.action == "title":
         await state.set_state(EditWish.waiting_for_title)
-        await state.update_data(wish_id=parsed.item_id)
+        await state.update_data(wish_id=parsed.item_id, **(card.as_state() if card else {}))
         await callback.message.answer(
             "📝 Введите новое название",
             reply_markup=cancel_input_keyboard("Введите новое название"),
@@ -174,16 +231,20 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
 
     if parsed.action == "url":
         if parsed.value == "clear":
-            updated = await get_storage().clear_wish_url(callback.from_user.id, parsed.item_id)
+            updated = await get_storage().patch_wish(callback.from_user.id, parsed.item_id, link=None)
             if updated is None:
                 await callback.answer("⚠️ Не удалось обновить", show_alert=True)
                 return
+            if card is not None:
+                await _show_edit_card(callback.message, updated, card=card)
+                await callback.answer("🗑️ Ссылка очищена")
+                return
             await callback.message.answer("🗑️ Ссылка очищена", reply_markup=main_menu_keyboard())
             await _show_edit_card(callback.message, updated)
             await callback.answer()
             return
         await state.set_state(EditWish.waiting_for_url)
-        await state.update_data(wish_id=parsed.item_id)
+        await state.update_data(wish_id=parsed.item_id, **(card.as_state() if card else {}))
         await callback.message.answer(
             "🔗 Отправьте новую ссылку",
             reply_markup=cancel_input_keyboard("Отправьте ссылку"),
@@ -193,11 +254,14 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
 
     if parsed.action == "photo":
         await state.set_state(EditWish.waiting_for_photo)
-        await state.update_data(wish_id=parsed.item_id)
+        await state.update_data(wish_id=parsed.item_id, **(card.as_state() if card else {}))
         await callback.message.answer(
             "🖼️ Отправьте новое изображение",
             reply_markup=cancel_input_keyboard("Отправьте фото"),
         )
+        if card is not None and await edit_markup_in_place(callback.bot, card, build_photo_prompt_menu(parsed.item_id)):
+            await callback.answer()
+            return
         await callback.message.answer(
             "🗑️ Можно убрать фото кнопкой ниже.",
             reply_markup=build_photo_prompt_menu(parsed.item_id),
@@ -206,12 +270,22 @@ async def handle_edit_callback(callback: CallbackQuery, state: FSMContext) -> No
         return
 
     if parsed.action == "photo|clear":
-        updated = await get_storage().clear_wish_photo(callback.from_user.id, parsed.item_id)
+        updated = await get_storage().patch_wish(
+            callback.from_user.id,
+            parsed.item_id,
+            image_url=None,
+            image_bytes=None,
+        )
         if updated is None:
             await callback.answer("⚠️ Не удалось обновить", show_alert=True)
             return
+        # A photo card cannot turn into a text message, so the card is only edited
+        # when it was text already; otherwise _show_edit_card sends a new one.
+        await _show_edit_card(callback.message, updated, card=card)
+        if card is not None:
+            await callback.answer("🗑️ Фото убрано")
+            return
         await callback.message.answer("🗑️ Фото убрано", reply_markup=main_menu_keyboard())
-        await _show_edit_card(callback.message, updated)
         await callback.answer()
         return
 
@@ -229,6 +303,7 @@ def _state_requires_edit(state_name: Optional[str]) -> bool:
 async def _return_to_card(message: Message, state: FSMContext) -> None:
     data = await state.get_data()
     wish_id = data.get("wish_id")
+    card = await _card_in_state(state)
     await state.clear()
     await state.set_state(UserSession.active)
     if not wish_id:
@@ -239,7 +314,7 @@ async def _return_to_card(message: Message, state: FSMContext) -> None:
     if wish is None:
         await message.answer("⚠️ Элемент не найден", reply_markup=main_menu_keyboard())
         return
-    await _show_edit_card(message, wish)
+    await _show_edit_card(message, wish, card=card)
 
 
 @router.message(F.text == "↩️ Отмена")
@@ -259,7 +334,7 @@ async def handle_new_title(message: Message, state: FSMContext) -> None:
     if not raw:
         await message.answer("⚠️ Название не может быть пустым")
         return
-    if len(raw) > 120:
+    if len(raw) > MAX_TITLE_LENGTH:
         await message.answer("⚠️ Слишком длинно, максимум 120 символов")
         return
     data = await state.get_data()
@@ -270,12 +345,12 @@ async def handle_new_title(message: Message, state: FSMContext) -> None:
         await state.set_state(UserSession.active)
         return
     storage = get_storage()
-    updated = await storage.update_wish_title(message.from_user.id, int(wish_id), raw)
+    updated = await storage.patch_wish(message.from_user.id, int(wish_id), title=raw)
     if updated is None:
         await message.answer("⚠️ Не удалось обновить", reply_markup=main_menu_keyboard())
     else:
         await message.answer("✅ Название обновлено", reply_markup=main_menu_keyboard())
-        await _show_edit_card(message, updated)
+        await _show_edit_card(message, updated, card=await _card_in_state(state))
     await state.clear()
     await state.set_state(UserSession.active)
 
@@ -302,24 +377,24 @@ async def handle_new_url(message: Message, state: FSMContext) -> None:
         return
     storage = get_storage()
     if not raw:
-        updated = await storage.clear_wish_url(message.from_user.id, int(wish_id))
+        updated = await storage.patch_wish(message.from_user.id, int(wish_id), link=None)
         if updated is None:
             await message.answer("⚠️ Не удалось обновить", reply_markup=main_menu_keyboard())
         else:
             await message.answer("🗑️ Ссылка очищена", reply_markup=main_menu_keyboard())
-            await _show_edit_card(message, updated)
+            await _show_edit_card(message, updated, card=await _card_in_state(state))
         await state.clear()
         await state.set_state(UserSession.active)
         return
     if not _is_valid_url(raw):
         await message.answer("⚠️ Некорректная ссылка, попробуйте снова")
         return
-    updated = await storage.update_wish_url(message.from_user.id, int(wish_id), raw)
+    updated = await storage.patch_wish(message.from_user.id, int(wish_id), link=raw)
     if updated is None:
         await message.answer("⚠️ Не удалось обновить", reply_markup=main_menu_keyboard())
     else:
         await message.answer("✅ Ссылка обновлена", reply_markup=main_menu_keyboard())
-        await _show_edit_card(message, updated)
+        await _show_edit_card(message, updated, card=await _card_in_state(state))
     await state.clear()
     await state.set_state(UserSession.active)
 
@@ -338,19 +413,18 @@ async def handle_new_photo(message: Message, state: FSMContext) -> None:
         await state.set_state(UserSession.active)
         return
     photo = _largest_photo(message.photo)
-    file_id = photo.file_id
     image_bytes = await _download_photo_if_needed(message, photo)
     storage = get_storage()
-    updated = await storage.update_wish_photo(
+    updated = await storage.patch_wish(
         message.from_user.id,
         int(wish_id),
-        file_id=file_id,
+        image_url=photo.file_id,
         image_bytes=image_bytes,
     )
     if updated is None:
         await message.answer("⚠️ Не удалось обновить", reply_markup=main_menu_keyboard())
     else:
         await message.answer("✅ Фото обновлено", reply_markup=main_menu_keyboard())
-        await _show_edit_card(message, updated)
+        await _show_edit_card(message, updated, card=await _card_in_state(state), replace_photo=True)
     await state.clear()
     await state.set_state(UserSession.active)
@@ -1,30 +1,39 @@
+from contextlib import aclosing
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
-from aiogram.types import BufferedInputFile, CallbackQuery
+from aiogram.types import CallbackQuery
 
-from bot.shared_utils import ensure_active_session, get_storage
-from core.formatting import compose_export_csv, compose_export_txt
+from bot.shared_utils import SpooledInputFile, ensure_active_session, get_storage
+from core.export import spool_export
+from core.formatting import iter_export_csv, iter_export_txt
 
 router = Router()
 
+EXPORT_FORMATTERS = {
+    "txt": iter_export_txt,
+    "csv": iter_export_csv,
+}
+
 
 @router.callback_query(F.data.startswith("export:"))
 @ensure_active_session
 async def callback_export(callback: CallbackQuery, state: FSMContext) -> None:
     storage = get_storage()
     format_name = callback.data.split(":", 1)[1]
-    user_id = callback.from_user.id
-    wishes = await storage.list_wishes(user_id)
-
-    if format_name == "txt":
-        content = compose_export_txt(wishes)
-        file = BufferedInputFile(content.encode("utf-8"), filename="wishlist.txt")
-    elif format_name == "csv":
-        content = compose_export_csv(wishes)
-        file = BufferedInputFile(content.encode("utf-8"), filename="wishlist.csv")
-    else:
+    compress = format_name.endswith(".gz")
+    formatter = EXPORT_FORMATTERS.get(format_name.removesuffix(".gz"))
+    if formatter is None:
         await callback.answer("Неизвестный формат экспорта.", show_alert=True)
         return
 
-    await callback.message.answer_document(file)
+    user_id = callback.from_user.id
+    filename = f"wishlist.{format_name}"
+    # Close the cursor-backed generators right away if spooling fails half way.
+    async with aclosing(storage.iter_wishes(user_id)) as wishes, aclosing(formatter(wishes)) as chunks:
+        spool = await spool_export(chunks, compress=compress)
+    try:
+        await callback.message.answer_document(SpooledInputFile(spool, filename=filename))
+    finally:
+        spool.close()
     await callback.answer("Экспорт готов!")
@@ -0,0 +1,69 @@
+from aiogram import F, Router
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery
+
+from bot.shared_utils import (
+    LIST_SCOPE_OWN,
+    LIST_SCOPE_PARTNER,
+    edit_wish_page,
+    ensure_active_session,
+    get_storage,
+    select_other_user,
+    send_wish_page,
+)
+from core.config import LIST_DISPLAY_MODE
+
+router = Router()
+
+EMPTY_OWN_LIST = "📭 Список пуст. Нажмите «➕ Добавить»."
+EMPTY_PARTNER_LIST = "📭 У партнёра пока пусто."
+
+
+@router.callback_query(F.data.startswith("list:"))
+@ensure_active_session
+async def handle_list_page(callback: CallbackQuery, state: FSMContext) -> None:
+    parts = (callback.data or "").split(":")
+    if len(parts) != 4 or parts[1] not in {LIST_SCOPE_OWN, LIST_SCOPE_PARTNER} or parts[2] not in {"prev", "next"}:
+        await callback.answer("⚠️ Неизвестное действие", show_alert=True)
+        return
+    _, scope, direction, raw_anchor = parts
+    try:
+        anchor_id = int(raw_anchor)
+    except ValueError:
+        await callback.answer("⚠️ Некорректный идентификатор", show_alert=True)
+        return
+
+    if scope == LIST_SCOPE_OWN:
+        owner_id = callback.from_user.id
+    else:
+        owner_id = select_other_user(callback.from_user.id)
+        if owner_id is None:
+            await callback.answer("⚠️ Партнёр не назначен.", show_alert=True)
+            return
+
+    storage = get_storage()
+    anchor = await storage.find_wish(owner_id, anchor_id)
+    if anchor is None:
+        # The anchor was deleted in the meantime: start over from the first page.
+        page = await storage.list_wishes_page(owner_id)
+    elif direction == "next":
+        page = await storage.list_wishes_page(owner_id, after=anchor.page_key())
+    else:
+        page = await storage.list_wishes_page(owner_id, before=anchor.page_key())
+    if not page.items and anchor is not None:
+        page = await storage.list_wishes_page(owner_id)
+
+    # Compact lists live in a single message that is paged in place.
+    render = edit_wish_page if LIST_DISPLAY_MODE == "compact" else send_wish_page
+    if scope == LIST_SCOPE_OWN:
+        await render(callback.message, page, EMPTY_OWN_LIST)
+    else:
+        await render(
+            callback.message,
+            page,
+            EMPTY_PARTNER_LIST,
+            scope=LIST_SCOPE_PARTNER,
+            show_actions=False,
+            title="💞 Список партнёра",
+        )
+    await callback.answer()
@@ -9,7 +9,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, PhotoSize
 
 from bot.fsm import AddWish, UserSession
-from bot.shared_utils import ensure_authorized, get_storage
+from bot.shared_utils import ensure_authorized, get_storage, is_cancel_command
 from core.models import Wish
 from ui.keyboards import ADD_BUTTON, cancel_input_keyboard, main_menu_keyboard
 
@@ -59,13 +59,6 @@ def _generate_fallback_title(link: str) -> str:
     return _FALLBACK_LINK_TITLE_GENERIC
 
 
-def _is_cancel_command(text: Optional[str]) -> bool:
-    if text is None:
-        return False
-    normalized = text.strip().lower()
-    return normalized in {"/cancel", "cancel", "stop", "↩️ отмена", "отмена"}
-
-
 async def _download_photo_if_needed(message: Message, photo: PhotoSize) -> bytes | None:
     if not photo.file_size or photo.file_size > _MAX_DOWNLOAD_SIZE or message.bot is None:
         return None
@@ -96,7 +89,7 @@ async def cmd_add(message: Message, state: FSMContext) -> None:
 async def process_add_input(message: Message, state: FSMContext) -> None:
     raw_text = message.text if message.text is not None else message.caption
 
-    if _is_cancel_command(message.text):
+    if is_cancel_command(message.text):
         await _cancel_addition(message, state)
         return
 
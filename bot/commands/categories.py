@@ -12,12 +12,17 @@ router = Router()
 @router.message(Command("categories"))
 @ensure_authorized(require_session=True)
 async def cmd_categories(message: Message, state: FSMContext) -> None:
-    categories = get_storage().collect_categories()
+    categories = await get_storage().collect_categories(message.from_user.id)
     if not categories:
         await message.answer(
             "Категории пока не созданы. Добавьте желания с указанием категорий через /add."
         )
         return
 
-    lines = [f"{category_to_emoji(category)} {escape_html_text(category)}" for category in categories]
+    lines: list[str] = []
+    for category in categories:
+        line = f"{category_to_emoji(category.name)} {escape_html_text(category.name)} — {category.count}"
+        if category.max_priority is not None:
+            line += f" · ⭐ до {category.max_priority}"
+        lines.append(line)
     await message.answer("\n".join(lines))
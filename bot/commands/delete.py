@@ -3,7 +3,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
-from bot.shared_utils import ensure_authorized, get_storage, send_wish_list
+from bot.shared_utils import ensure_authorized, get_storage, send_wish_page
 from ui.keyboards import main_menu_keyboard
 
 router = Router()
@@ -14,10 +14,10 @@ EMPTY_PROMPT = "📭 Список пуст. Нажмите «➕ Добавит
 @router.message(Command("delete"))
 @ensure_authorized(require_session=True)
 async def cmd_delete(message: Message, state: FSMContext) -> None:
-    wishes = await get_storage().list_wishes(message.from_user.id)
-    if not wishes:
+    page = await get_storage().list_wishes_page(message.from_user.id)
+    if not page.items:
         await message.answer(EMPTY_PROMPT, reply_markup=main_menu_keyboard())
         return
 
     await message.answer("❌ Выберите желание для удаления")
-    await send_wish_list(message, wishes, EMPTY_PROMPT)
+    await send_wish_page(message, page, EMPTY_PROMPT)
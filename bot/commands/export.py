@@ -12,8 +12,8 @@ router = Router()
 @router.message(Command("export"))
 @ensure_authorized(require_session=True)
 async def cmd_export(message: Message, state: FSMContext) -> None:
-    wishes = await get_storage().list_wishes(message.from_user.id)
-    if not wishes:
+    first_page = await get_storage().list_wishes_page(message.from_user.id, limit=1)
+    if not first_page.items:
         await message.answer(
             "Экспорт невозможен: список желаний пуст. Добавьте что-нибудь через /add."
         )
@@ -22,5 +22,7 @@ async def cmd_export(message: Message, state: FSMContext) -> None:
     builder = InlineKeyboardBuilder()
     builder.button(text="TXT", callback_data="export:txt")
     builder.button(text="CSV", callback_data="export:csv")
+    builder.button(text="TXT.gz", callback_data="export:txt.gz")
+    builder.button(text="CSV.gz", callback_data="export:csv.gz")
     builder.adjust(2)
     await message.answer("Выберите формат экспорта:", reply_markup=builder.as_markup())
@@ -0,0 +1,127 @@
+import asyncio
+import csv
+import io
+import logging
+from tempfile import SpooledTemporaryFile
+from typing import IO
+
+from aiogram import Router
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+from bot.fsm import ImportWishes, UserSession
+from bot.shared_utils import ensure_authorized, get_storage, is_cancel_command
+from core.formatting import parse_import_csv
+from core.models import Wish
+from ui.keyboards import cancel_input_keyboard, main_menu_keyboard
+
+router = Router()
+
+_MAX_IMPORT_SIZE = 10 * 1024 * 1024
+_MAX_REPORTED_ERRORS = 20
+# The download stays in memory up to this size and spills to a temporary file after it.
+_SPOOL_MEMORY_SIZE = 1024 * 1024
+_TOO_LARGE_TEXT = "⚠️ Файл слишком большой, максимум 10 МБ"
+
+
+class _ImportTooLarge(Exception):
+    pass
+
+
+class _LimitedSpool:
+    """Download destination that spools chunks and aborts once ``limit`` bytes are exceeded."""
+
+    def __init__(self, spool: IO[bytes], limit: int) -> None:
+        self._spool = spool
+        self._limit = limit
+        self._size = 0
+
+    def write(self, chunk: bytes) -> int:
+        self._size += len(chunk)
+        if self._size > self._limit:
+            raise _ImportTooLarge()
+        return self._spool.write(chunk)
+
+    def flush(self) -> None:
+        self._spool.flush()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._spool.seek(offset, whence)
+
+
+def _parse_spool(spool: IO[bytes]) -> tuple[list[Wish], list[tuple[int, str]]]:
+    wishes: list[Wish] = []
+    errors: list[tuple[int, str]] = []
+    spool.seek(0)
+    text_stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+    try:
+        for line_number, wish, error in parse_import_csv(text_stream):
+            if wish is None:
+                errors.append((line_number, error or "некорректная строка"))
+            else:
+                wishes.append(wish)
+    finally:
+        # Leave closing to the spool's own context manager.
+        text_stream.detach()
+    return wishes, errors
+
+
+@router.message(Command("import"))
+@ensure_authorized(require_session=True)
+async def cmd_import(message: Message, state: FSMContext) -> None:
+    await state.set_state(ImportWishes.waiting_document)
+    await message.answer(
+        "📥 Отправьте CSV-файл, полученный через /export",
+        reply_markup=cancel_input_keyboard("Прикрепите CSV-файл"),
+    )
+
+
+async def _finish_import(message: Message, state: FSMContext, text: str) -> None:
+    await state.clear()
+    await state.set_state(UserSession.active)
+    await message.answer(text, reply_markup=main_menu_keyboard())
+
+
+@router.message(StateFilter(ImportWishes.waiting_document))
+@ensure_authorized(require_session=True)
+async def process_import_document(message: Message, state: FSMContext) -> None:
+    if is_cancel_command(message.text):
+        await _finish_import(message, state, "↩️ Отменено")
+        return
+
+    document = message.document
+    if document is None:
+        await message.answer("⚠️ Прикрепите CSV-файл как документ")
+        return
+    if document.file_size and document.file_size > _MAX_IMPORT_SIZE:
+        await message.answer(_TOO_LARGE_TEXT)
+        return
+    if message.bot is None:
+        return
+
+    with SpooledTemporaryFile(max_size=_SPOOL_MEMORY_SIZE) as spool:
+        # file_size is optional in the Bot API, so the limit is enforced while streaming too.
+        try:
+            await message.bot.download(document, destination=_LimitedSpool(spool, _MAX_IMPORT_SIZE))
+        except _ImportTooLarge:
+            await message.answer(_TOO_LARGE_TEXT)
+            return
+        try:
+            # Decoding and parsing up to 10 MB would stall the event loop; the parsed
+            # rows are bounded by the same limit, so they are collected in memory.
+            wishes, errors = await asyncio.to_thread(_parse_spool, spool)
+        except (UnicodeDecodeError, csv.Error) as exc:
+            logging.warning("Failed to parse import from user %s: %s", message.from_user.id, exc)
+            await _finish_import(message, state, "⚠️ Не удалось прочитать файл. Нужен CSV в кодировке UTF-8.")
+            return
+
+    imported = await get_storage().add_wishes_bulk(message.from_user.id, wishes)
+
+    lines = [f"✅ Импортировано: {imported}"]
+    if errors:
+        lines.append(f"⚠️ Пропущено строк: {len(errors)}")
+        lines.extend(f"Строка {line_number}: {reason}" for line_number, reason in errors[:_MAX_REPORTED_ERRORS])
+        if len(errors) > _MAX_REPORTED_ERRORS:
+            lines.append(f"…и ещё {len(errors) - _MAX_REPORTED_ERRORS}")
+    await _finish_import(message, state, "\n".join(lines))
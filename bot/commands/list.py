@@ -3,7 +3,7 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
-from bot.shared_utils import ensure_authorized, get_storage, send_wish_list
+from bot.shared_utils import ensure_authorized, get_storage, send_wish_page
 from ui.keyboards import MY_LIST_BUTTON
 
 router = Router()
@@ -15,5 +15,5 @@ EMPTY_WISH_LIST_HELP = "📭 Список пуст. Нажмите «➕ Доб
 @router.message(F.text == MY_LIST_BUTTON)
 @ensure_authorized(require_session=True)
 async def cmd_list(message: Message, state: FSMContext) -> None:
-    wishes = await get_storage().list_wishes(message.from_user.id)
-    await send_wish_list(message, wishes, EMPTY_WISH_LIST_HELP, title="📋 Ваш список")
+    page = await get_storage().list_wishes_page(message.from_user.id)
+    await send_wish_page(message, page, EMPTY_WISH_LIST_HELP, title="📋 Ваш список")
@@ -3,12 +3,19 @@ from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
 
-from bot.shared_utils import ensure_authorized, get_storage, select_other_user, send_wish_list
+from bot.shared_utils import (
+    LIST_SCOPE_PARTNER,
+    ensure_authorized,
+    get_storage,
+    select_other_user,
+    send_wish_page,
+)
 from ui.keyboards import PARTNER_LIST_BUTTON
 
 router = Router()
 
 EMPTY_PARTNER_LIST = "📭 У партнёра пока пусто."
+PARTNER_LIST_TITLE = "💞 Список партнёра"
 
 
 @router.message(Command("others"))
@@ -20,11 +27,12 @@ async def cmd_partner_list(message: Message, state: FSMContext) -> None:
         await message.answer("⚠️ Партнёр не назначен.")
         return
 
-    wishes = await get_storage().list_wishes(other_id)
-    await send_wish_list(
+    page = await get_storage().list_wishes_page(other_id)
+    await send_wish_page(
         message,
-        wishes,
+        page,
         EMPTY_PARTNER_LIST,
+        scope=LIST_SCOPE_PARTNER,
         show_actions=False,
-        title="💞 Список партнёра",
+        title=PARTNER_LIST_TITLE,
     )
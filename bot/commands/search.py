@@ -17,14 +17,10 @@ async def cmd_search(message: Message, state: FSMContext, command: CommandObject
         await message.answer("🔍 Укажите запрос: /search <текст>")
         return
 
-    wishes = await get_storage().list_wishes(message.from_user.id)
-    matched = [
-        wish
-        for wish in wishes
-        if query.lower() in wish.title.lower() or (wish.description and query.lower() in wish.description.lower())
-    ]
+    matched = await get_storage().search_wishes(message.from_user.id, query)
     if not matched:
         await message.answer("⚠️ Совпадений нет.")
         return
 
-    await send_wish_list(message, matched, "⚠️ Совпадений нет.")
+    # Results come ranked by relevance; regrouping them by category would lose that.
+    await send_wish_list(message, matched, "⚠️ Совпадений нет.", title="🔍 Результаты поиска", keep_order=True)
@@ -5,6 +5,10 @@ class AddWish(StatesGroup):
     waiting_input = State()
 
 
+class ImportWishes(StatesGroup):
+    waiting_document = State()
+
+
 class EditWish(StatesGroup):
     waiting_for_title = State()
     waiting_for_url = State()
@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from aiogram.types import InlineKeyboardMarkup
+
+from core.config import MESSAGE_REGISTRY_SIZE
+
+_MAX_MESSAGES_PER_WISH = 10
+# Bots can delete their messages for 48 hours; keep a margin for clock skew and slow deletes.
+DELETE_WINDOW_SECONDS = 47 * 60 * 60
+
+SentMessage = tuple[int, float]
+
+
+def can_delete(sent_at: float, now: Optional[float] = None) -> bool:
+    """Whether a message sent at ``sent_at`` (unix time) is still inside the delete window."""
+    return (time.time() if now is None else now) - sent_at < DELETE_WINDOW_SECONDS
+
+
+class MessageRegistry:
+    """
+    Remembers which sent messages show a wish, per chat.
+
+    Messages dedicated to one wish (a card, its overflow text, an album item,
+    an edit card) are recorded with their send time, so they can be deleted
+    when that wish is removed without re-sending the list. Messages whose
+    keyboard acts on several wishes (album actions, batched text cards) are
+    recorded with that keyboard, so the removed wish's buttons can be dropped
+    from them. Bounded LRU and in-process only: after a restart, or once an
+    entry is forgotten, the old messages stay in the chat and the delete
+    handler falls back to the message the button was pressed on.
+    """
+
+    def __init__(self, max_entries: int = MESSAGE_REGISTRY_SIZE) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[tuple[int, int], list[SentMessage]]" = OrderedDict()
+        self._shared: "OrderedDict[tuple[int, int], tuple[frozenset[int], InlineKeyboardMarkup]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._shared)
+
+    def record(self, chat_id: int, wish_id: int, message_ids: Iterable[int], sent_at: Optional[float] = None) -> None:
+        sent_at = time.time() if sent_at is None else sent_at
+        key = (chat_id, int(wish_id))
+        known = self._entries.pop(key, [])
+        seen = {message_id for message_id, _ in known}
+        known.extend((message_id, sent_at) for message_id in message_ids if message_id not in seen)
+        self._entries[key] = known[-_MAX_MESSAGES_PER_WISH:]
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, chat_id: int, wish_id: int) -> list[SentMessage]:
+        return self._entries.pop((chat_id, int(wish_id)), [])
+
+    def record_shared(
+        self,
+        chat_id: int,
+        message_id: int,
+        wish_ids: Iterable[int],
+        reply_markup: InlineKeyboardMarkup,
+    ) -> None:
+        key = (chat_id, message_id)
+        ids = frozenset(int(wish_id) for wish_id in wish_ids)
+        self._shared.pop(key, None)
+        if not ids:
+            return
+        self._shared[key] = (ids, reply_markup)
+        while len(self._shared) > self._max_entries:
+            self._shared.popitem(last=False)
+
+    def pop_shared(self, chat_id: int, wish_id: int) -> dict[int, InlineKeyboardMarkup]:
+        """Forget and return (message id -> keyboard) of this chat's shared messages acting on the wish."""
+        keys = [key for key, (ids, _) in self._shared.items() if key[0] == chat_id and wish_id in ids]
+        return {key[1]: self._shared.pop(key)[1] for key in keys}
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._shared.clear()
+
+
+message_registry = MessageRegistry()
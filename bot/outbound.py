@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, Optional, Union
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    CopyMessage,
+    DeleteMessage,
+    DeleteMessages,
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    Response,
+    SendDocument,
+    SendMediaGroup,
+    SendMessage,
+    SendPhoto,
+    TelegramMethod,
+)
+from aiogram.methods.base import TelegramType
+
+from core.config import (
+    OUTBOUND_CHAT_BURST,
+    OUTBOUND_CHAT_RATE,
+    OUTBOUND_GLOBAL_RATE,
+    OUTBOUND_GROUP_PER_MINUTE,
+    OUTBOUND_MAX_RETRIES,
+)
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+_LANES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+# Methods that count against Telegram's flood limits; everything else (getUpdates,
+# getFile, ...) bypasses the scheduler.
+_SCHEDULED_METHODS = (
+    AnswerCallbackQuery,
+    CopyMessage,
+    DeleteMessage,
+    DeleteMessages,
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessage,
+    SendDocument,
+    SendMediaGroup,
+    SendMessage,
+    SendPhoto,
+)
+_MAX_TRACKED_CHATS = 10_000
+
+ChatKey = Union[int, str]
+
+_current_priority: ContextVar[int] = ContextVar("outbound_priority", default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def outbound_priority(priority: int) -> Iterator[None]:
+    """Send every Bot API call made inside the block through the given lane."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated_at", "blocked_until")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+
+    def is_idle(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity and now >= self.blocked_until
+
+
+@dataclass(slots=True)
+class _Ticket:
+    chat_key: Optional[ChatKey]
+    future: "asyncio.Future[None]"
+
+
+@dataclass(slots=True)
+class OutboundStats:
+    sent: int = 0
+    retries: int = 0
+    failed: int = 0
+    queued: int = 0
+    max_queue_depth: int = 0
+    admitted: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.admitted if self.admitted else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {field.name: getattr(self, field.name) for field in fields(self)}
+        result["mean_wait_ms"] = round(self.mean_wait * 1000, 3)
+        result["max_wait_ms"] = round(self.max_wait * 1000, 3)
+        del result["total_wait"], result["max_wait"]
+        return result
+
+
+class OutboundScheduler(BaseRequestMiddleware):
+    """
+    Request middleware that paces outgoing Bot API calls to stay under flood limits.
+
+    Each call waits for a token from the global bucket and from its chat's bucket;
+    group chats (negative ids or @usernames) get the slower per-minute limit.
+    Waiting calls are served by priority lane: callback answers first, then
+    regular replies, then bulk list output (see ``outbound_priority``).
+    A RetryAfter pauses the offending chat and re-queues the call up to
+    ``max_retries`` times instead of dropping it.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rate: float = OUTBOUND_GLOBAL_RATE,
+        chat_rate: float = OUTBOUND_CHAT_RATE,
+        chat_burst: float = OUTBOUND_CHAT_BURST,
+        group_per_minute: float = OUTBOUND_GROUP_PER_MINUTE,
+        max_retries: int = OUTBOUND_MAX_RETRIES,
+    ) -> None:
+        self._global = TokenBucket(global_rate, max(global_rate, 1.0), time.monotonic())
+        self._chat_rate = chat_rate
+        self._chat_burst = max(chat_burst, 1.0)
+        self._group_rate = group_per_minute / 60
+        self._max_retries = max_retries
+        self._chats: Dict[ChatKey, TokenBucket] = {}
+        self._lanes: Dict[int, Deque[_Ticket]] = {lane: deque() for lane in _LANES}
+        self._wake = asyncio.Event()
+        self._runner: Optional[asyncio.Task[None]] = None
+        self.stats = OutboundStats()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not isinstance(method, _SCHEDULED_METHODS):
+            return await make_request(bot, method)
+
+        if isinstance(method, AnswerCallbackQuery):
+            # Callback answers are not chat messages: they only share the global budget.
+            chat_key, priority = None, PRIORITY_HIGH
+        else:
+            chat_key, priority = getattr(method, "chat_id", None), _current_priority.get()
+
+        attempt = 0
+        while True:
+            await self._admit(chat_key, priority)
+            try:
+                response = await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                self._penalize(chat_key, exc.retry_after)
+                if attempt > self._max_retries:
+                    self.stats.failed += 1
+                    raise
+                self.stats.retries += 1
+                logging.warning(
+                    "Flood limit on %s for chat %s, retrying in %ss (attempt %s/%s)",
+                    type(method).__name__,
+                    chat_key,
+                    exc.retry_after,
+                    attempt,
+                    self._max_retries,
+                )
+                continue
+            self.stats.sent += 1
+            return response
+
+    def _is_group(self, chat_key: ChatKey) -> bool:
+        return isinstance(chat_key, str) or chat_key < 0
+
+    def _chat_bucket(self, chat_key: ChatKey, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_key)
+        if bucket is None:
+            if len(self._chats) >= _MAX_TRACKED_CHATS:
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_idle(now)}
+            rate = self._group_rate if self._is_group(chat_key) else self._chat_rate
+            bucket = TokenBucket(rate, self._chat_burst, now)
+            self._chats[chat_key] = bucket
+        return bucket
+
+    def _penalize(self, chat_key: Optional[ChatKey], retry_after: float) -> None:
+        now = time.monotonic()
+        bucket = self._global if chat_key is None else self._chat_bucket(chat_key, now)
+        bucket.block(now + retry_after)
+
+    async def _admit(self, chat_key: Optional[ChatKey], priority: int) -> None:
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(chat_key=chat_key, future=loop.create_future())
+        self._lanes[priority].append(ticket)
+        self.stats.queued += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queued)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+        self._wake.set()
+
+        started = time.monotonic()
+        try:
+            await ticket.future
+        finally:
+            # A cancelled caller leaves a done future behind; the runner drops it.
+            ticket.future.cancel()
+        waited = time.monotonic() - started
+        self.stats.admitted += 1
+        self.stats.total_wait += waited
+        self.stats.max_wait = max(self.stats.max_wait, waited)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            delay = self._dispatch()
+            if delay is None:
+                await self._wake.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self) -> Optional[float]:
+        """Admit every ticket that has tokens, highest lane first; return the shortest wait left."""
+        now = time.monotonic()
+        delay: Optional[float] = None
+        queued = 0
+        for lane in _LANES:
+            pending = self._lanes[lane]
+            waiting: Deque[_Ticket] = deque()
+            while pending:
+                ticket = pending.popleft()
+                if ticket.future.done():
+                    continue
+                chat_bucket = None if ticket.chat_key is None else self._chat_bucket(ticket.chat_key, now)
+                wait = self._global.wait_time(now)
+                if chat_bucket is not None:
+                    wait = max(wait, chat_bucket.wait_time(now))
+                if wait <= 0:
+                    self._global.take(now)
+                    if chat_bucket is not None:
+                        chat_bucket.take(now)
+                    ticket.future.set_result(None)
+                    continue
+                waiting.append(ticket)
+                delay = wait if delay is None else min(delay, wait)
+            self._lanes[lane] = waiting
+            queued += len(waiting)
+        self.stats.queued = queued
+        return delay
+
+    def queue_depth(self) -> Dict[str, int]:
+        return {
+            "high": len(self._lanes[PRIORITY_HIGH]),
+            "normal": len(self._lanes[PRIORITY_NORMAL]),
+            "low": len(self._lanes[PRIORITY_LOW]),
+        }
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+        for lane in self._lanes.values():
+            while lane:
+                lane.popleft().future.cancel()
@@ -1,13 +1,13 @@
 from aiogram import Dispatcher
 
 from bot.shared_utils import set_storage
-from core.storage import Storage
+from core.storage_protocol import StorageProtocol
 
 
-def register_routes(dp: Dispatcher, storage: Storage) -> None:
+def register_routes(dp: Dispatcher, storage: StorageProtocol) -> None:
     set_storage(storage)
 
-    from bot.callbacks import delete_callbacks, edit_callbacks, export_callbacks
+    from bot.callbacks import delete_callbacks, edit_callbacks, export_callbacks, list_callbacks
     from bot.commands import (
         add,
         categories,
@@ -15,6 +15,7 @@ def register_routes(dp: Dispatcher, storage: Storage) -> None:
         edit,
         export,
         help,
+        import_csv,
         list as list_command,
         login,
         logout,
@@ -37,9 +38,11 @@ def register_routes(dp: Dispatcher, storage: Storage) -> None:
         edit,
         delete,
         export,
+        import_csv,
         settings,
         edit_callbacks,
         delete_callbacks,
         export_callbacks,
+        list_callbacks,
     ):
         dp.include_router(module.router)
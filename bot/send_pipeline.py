@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import (
+    CopyMessage,
+    ForwardMessage,
+    Response,
+    SendDocument,
+    SendMediaGroup,
+    SendMessage,
+    SendPhoto,
+    TelegramMethod,
+)
+from aiogram.methods.base import TelegramType
+
+from core.config import SEND_PIPELINE_WORKERS
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+SendJob = Callable[[], Awaitable[Any]]
+
+# Set in worker tasks: calls made by a queued job are already in their chat's order.
+_in_send_job: ContextVar[bool] = ContextVar("in_send_job", default=False)
+
+# Calls that add a message to the chat; edits and deletes touch messages already there.
+_ORDERED_METHODS = (CopyMessage, ForwardMessage, SendDocument, SendMediaGroup, SendMessage, SendPhoto)
+
+
+@dataclass(slots=True)
+class PipelineStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    pending: int = 0
+    max_pending: int = 0
+    busy_chats: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class SendPipeline:
+    """
+    Delivers queued send jobs concurrently across chats while keeping order within a chat.
+
+    Jobs are grouped by chat. A chat with queued jobs is handed to one worker,
+    which runs that chat's jobs one by one until the chat's queue is empty, so
+    a chat is never served by two workers at once. At most ``workers`` chats
+    are served in parallel; actual Bot API pacing is left to the outbound
+    scheduler. New messages sent outside the pipeline to a busy chat join its
+    queue through ``ChatOrderMiddleware``.
+    """
+
+    def __init__(self, workers: int = SEND_PIPELINE_WORKERS) -> None:
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        self._worker_count = workers
+        self._jobs: Dict[Hashable, Deque[SendJob]] = {}
+        self._ready: "asyncio.Queue[Hashable]" = asyncio.Queue()
+        self._workers: List[asyncio.Task[None]] = []
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.stats = PipelineStats()
+
+    def start(self) -> "SendPipeline":
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+        return self
+
+    def submit(self, chat_id: Hashable, job: SendJob) -> None:
+        queue = self._jobs.get(chat_id)
+        if queue is None:
+            # No worker owns this chat yet: queue it for the next free worker.
+            queue = self._jobs[chat_id] = deque()
+            self._ready.put_nowait(chat_id)
+        queue.append(job)
+        self._idle.clear()
+        stats = self.stats
+        stats.submitted += 1
+        stats.pending += 1
+        stats.max_pending = max(stats.max_pending, stats.pending)
+
+    def is_busy(self, chat_id: Hashable) -> bool:
+        """Whether the chat has jobs queued or running."""
+        return chat_id in self._jobs
+
+    async def run(self, chat_id: Hashable, job: SendJob) -> Any:
+        """Queue ``job`` behind the chat's pending jobs and wait for its result."""
+        result: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+
+        async def resolve() -> None:
+            if result.cancelled():
+                return
+            try:
+                value = await job()
+            except Exception as exc:
+                if not result.done():
+                    result.set_exception(exc)
+            else:
+                if not result.done():
+                    result.set_result(value)
+
+        self.submit(chat_id, resolve)
+        return await result
+
+    async def _work(self) -> None:
+        _in_send_job.set(True)
+        while True:
+            chat_id = await self._ready.get()
+            queue = self._jobs[chat_id]
+            self.stats.busy_chats += 1
+            try:
+                while queue:
+                    job = queue.popleft()
+                    try:
+                        await job()
+                    except Exception:
+                        self.stats.failed += 1
+                        logging.exception("Send job for chat %s failed", chat_id)
+                    else:
+                        self.stats.completed += 1
+                    finally:
+                        self.stats.pending -= 1
+            finally:
+                del self._jobs[chat_id]
+                self.stats.busy_chats -= 1
+                if not self._jobs:
+                    self._idle.set()
+
+    async def drain(self) -> None:
+        await self._idle.wait()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        if self._workers:
+            try:
+                await asyncio.wait_for(self.drain(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Send pipeline closed with %s pending jobs", self.stats.pending)
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+_pipeline: Optional[SendPipeline] = None
+
+
+def set_send_pipeline(instance: Optional[SendPipeline]) -> None:
+    global _pipeline
+    _pipeline = instance
+
+
+def get_send_pipeline() -> Optional[SendPipeline]:
+    return _pipeline
+
+
+async def deliver(chat_id: int, job: SendJob) -> None:
+    """Queue ``job`` for ``chat_id`` when the pipeline is running, otherwise run it inline."""
+    if _pipeline is None:
+        await job()
+        return
+    _pipeline.submit(chat_id, job)
+
+
+class ChatOrderMiddleware(BaseRequestMiddleware):
+    """
+    Request middleware that keeps direct sends behind a chat's queued jobs.
+
+    A handler that queued a list and then replies in the same chat would
+    otherwise overtake the list. A new message for a chat with queued or running
+    jobs is run as a pipeline job and awaited, so the chat sees its messages in
+    the order they were issued. Everything else goes straight through: sends to
+    idle chats, edits and deletes of existing messages, calls without a chat
+    (callback answers, getUpdates, ...) and calls made by queued jobs themselves.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        pipeline = _pipeline
+        if (
+            pipeline is None
+            or not isinstance(method, _ORDERED_METHODS)
+            or _in_send_job.get()
+            or not pipeline.is_busy(method.chat_id)
+        ):
+            return await make_request(bot, method)
+        return await pipeline.run(method.chat_id, partial(make_request, bot, method))
@@ -2,38 +2,52 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from functools import wraps
-from typing import Any, Awaitable, Callable, Optional, TypeVar, cast
+from dataclasses import dataclass
+from functools import partial, wraps
+from typing import IO, TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Callable, Optional, TypeVar, cast
 
 from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message, User
-from aiogram.types.input_file import BufferedInputFile
+from aiogram.types import CallbackQuery, InputMediaPhoto, Message, User
+from aiogram.types.input_file import DEFAULT_CHUNK_SIZE, BufferedInputFile, InputFile
 
 from bot.fsm import UserSession
+from bot.message_registry import message_registry
+from bot.outbound import PRIORITY_LOW, outbound_priority
+from bot.send_pipeline import deliver
 from core.config import (
     AUTHORIZED_IDENTIFIERS,
     AUTHORIZED_NUMERIC_IDS,
+    LIST_DISPLAY_MODE,
+    OUTBOUND_SCHEDULER,
     canonicalize_identifier,
 )
 from core.formatting import sort_wishes_for_display
-from core.models import Wish
-from core.storage import Storage
+from core.models import Wish, WishPage
+from core.storage_protocol import StorageProtocol
 from ui.keyboards import (
+    build_compact_list_keyboard,
+    build_compact_wish_line,
+    build_list_pager,
+    build_numbered_actions_keyboard,
+    MAX_CAPTION_LENGTH,
     build_wish_actions_keyboard,
-    build_wish_card,
     main_menu_keyboard,
+    render_wish_card,
 )
 
-_storage: Optional[Storage] = None
+if TYPE_CHECKING:
+    from aiogram import Bot
 
+_storage: Optional[StorageProtocol] = None
 
-def set_storage(instance: Storage) -> None:
+
+def set_storage(instance: StorageProtocol) -> None:
     global _storage
     _storage = instance
 
 
-def get_storage() -> Storage:
+def get_storage() -> StorageProtocol:
     if _storage is None:
         raise RuntimeError("Storage instance is not configured.")
     return _storage
@@ -178,11 +192,41 @@ def _extract_state(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Optional[FS
     return None
 
 
+def is_cancel_command(text: Optional[str]) -> bool:
+    """Whether a message typed while the bot waits for input asks to cancel it."""
+    if text is None:
+        return False
+    normalized = text.strip().lower()
+    return normalized in {"/cancel", "cancel", "stop", "↩️ отмена", "отмена"}
+
+
 def describe_wish_for_confirmation(wish: Wish) -> str:
-    return build_wish_card(wish)
+    return render_wish_card(wish).text
+
+
+class MappedInputFile(BufferedInputFile):
+    """BufferedInputFile that streams slices of a memoryview (e.g. an mmap) without copying."""
+
+    async def read(self, bot: "Bot") -> AsyncGenerator[bytes, None]:
+        view = memoryview(self.data)
+        for start in range(0, len(view), self.chunk_size):
+            yield view[start : start + self.chunk_size]
+
+
+class SpooledInputFile(InputFile):
+    """InputFile that uploads an open binary file (e.g. a SpooledTemporaryFile) chunk by chunk."""
+
+    def __init__(self, file: IO[bytes], filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot: "Bot") -> AsyncGenerator[bytes, None]:
+        # A spooled export may have rolled over to disk; keep its reads off the event loop.
+        await asyncio.to_thread(self.file.seek, 0)
+        while chunk := await asyncio.to_thread(self.file.read, self.chunk_size):
+            yield chunk
 
 
-MAX_CAPTION_LENGTH = 1024
 MAX_MESSAGE_LENGTH = 4096
 
 
@@ -191,6 +235,10 @@ async def _send_with_retry(
     *args: Any,
     **kwargs: Any,
 ) -> Any:
+    # Pacing and flood-limit retries live in bot.outbound.OutboundScheduler; retrying
+    # here as well would stack a second backoff, so this only runs without it.
+    if OUTBOUND_SCHEDULER:
+        return await sender(*args, **kwargs)
     try:
         return await sender(*args, **kwargs)
     except TelegramRetryAfter as exc:
@@ -240,11 +288,61 @@ def _chunk_text(text: str, limit: int) -> list[str]:
     return chunks or [text[:limit]]
 
 
-async def _send_text(message: Message, text: str, *, reply_markup: Any = None) -> None:
+async def _send_text(message: Message, text: str, *, reply_markup: Any = None) -> list[Any]:
     chunks = _chunk_text(text, MAX_MESSAGE_LENGTH)
+    sent: list[Any] = []
     for index, chunk in enumerate(chunks):
         markup = reply_markup if index == 0 else None
-        await _send_with_retry(message.answer, chunk, reply_markup=markup)
+        sent.append(await _send_with_retry(message.answer, chunk, reply_markup=markup))
+    return sent
+
+
+def register_wish_messages(wish: Wish, sent: list[Any]) -> None:
+    """Record messages that show only this wish, so deleting it can remove exactly them."""
+    if wish.id is None:
+        return
+    messages = [item for item in sent if isinstance(item, Message)]
+    if messages:
+        message_registry.record(
+            messages[0].chat.id,
+            int(wish.id),
+            [item.message_id for item in messages],
+            sent_at=messages[0].date.timestamp(),
+        )
+
+
+def register_shared_message(items: list[NumberedWish], sent: list[Any], reply_markup: Any) -> None:
+    """Record a message whose keyboard acts on several wishes, so deleting one can drop its buttons."""
+    if reply_markup is None or not sent or not isinstance(sent[0], Message):
+        return
+    wish_ids = [int(wish.id) for _, wish in items if wish.id is not None]
+    message_registry.record_shared(sent[0].chat.id, sent[0].message_id, wish_ids, reply_markup)
+
+
+async def _resolve_photo_source(wish: Wish) -> Any:
+    if wish.image_url:
+        return wish.image_url
+    if wish.has_image and wish.user_id is not None and wish.id is not None:
+        image = await get_storage().load_wish_image(wish.user_id, wish.id)
+        if image:
+            return MappedInputFile(image, filename=f"wish-{wish.id}.jpg")
+    return None
+
+
+async def remember_uploaded_photo(wish: Wish, photo_source: Any, sent: Any) -> None:
+    """After uploading stored bytes, keep Telegram's file_id so later sends skip the upload."""
+    if not isinstance(photo_source, BufferedInputFile) or not isinstance(sent, Message) or not sent.photo:
+        return
+    if wish.user_id is None or wish.id is None:
+        return
+    file_id = sent.photo[-1].file_id
+    try:
+        await get_storage().remember_image_file_id(wish.user_id, int(wish.id), file_id, image_hash=wish.image_hash)
+    except Exception as exc:
+        # The photo is already delivered; failing to cache its id only costs a re-upload next time.
+        logging.warning("Failed to store file_id for wish %s: %s", wish.id, exc)
+        return
+    wish.image_url = file_id
 
 
 async def _send_photo_with_optional_text(
@@ -252,20 +350,21 @@ async def _send_photo_with_optional_text(
     wish: Wish,
     caption: str,
     reply_markup: Any,
-) -> None:
-    photo_source: Any
-    if wish.image_url:
-        photo_source = wish.image_url
-    elif wish.image:
-        photo_source = BufferedInputFile(bytes(wish.image), filename=f"wish-{wish.id or 'image'}.jpg")
-    else:
-        await _send_text(message, caption, reply_markup=reply_markup)
-        return
+    photo_source: Any = None,
+    *,
+    fits_caption: Optional[bool] = None,
+) -> list[Any]:
+    if photo_source is None:
+        photo_source = await _resolve_photo_source(wish)
+    if photo_source is None:
+        return await _send_text(message, caption, reply_markup=reply_markup)
 
-    caption_to_send = caption if len(caption) <= MAX_CAPTION_LENGTH else None
+    if fits_caption is None:
+        fits_caption = len(caption) <= MAX_CAPTION_LENGTH
+    caption_to_send = caption if fits_caption else None
 
     try:
-        await _send_with_retry(
+        sent = await _send_with_retry(
             message.answer_photo,
             photo_source,
             caption=caption_to_send,
@@ -273,36 +372,421 @@ async def _send_photo_with_optional_text(
         )
     except TelegramBadRequest as exc:
         logging.warning("Failed to send photo for wish %s: %s. Falling back to text output.", wish.id, exc)
-        await _send_text(message, caption, reply_markup=reply_markup)
-        return
+        return await _send_text(message, caption, reply_markup=reply_markup)
+    await remember_uploaded_photo(wish, photo_source, sent)
 
     if caption_to_send is None:
-        await _send_text(message, caption)
+        return [sent, *await _send_text(message, caption)]
+    return [sent]
 
 
-async def send_wish_list(
+def _has_photo(wish: Wish) -> bool:
+    return bool(wish.image_url or wish.has_image)
+
+
+async def _send_wish_card(message: Message, wish: Wish, show_actions: bool) -> None:
+    rendered = render_wish_card(wish)
+    keyboard_markup = build_wish_actions_keyboard(int(wish.id)) if show_actions and wish.id is not None else None
+    if _has_photo(wish):
+        sent = await _send_photo_with_optional_text(
+            message,
+            wish,
+            rendered.text,
+            keyboard_markup,
+            fits_caption=rendered.fits_caption,
+        )
+    else:
+        sent = await _send_text(message, rendered.text, reply_markup=keyboard_markup)
+    register_wish_messages(wish, sent)
+
+
+MEDIA_GROUP_LIMIT = 10
+ALBUM_ACTIONS_TEXT = "👆 Действия с желаниями из альбома"
+NumberedWish = tuple[int, Wish]
+
+
+def _numbered_card(number: int, wish: Wish) -> str:
+    return f"<b>{number}.</b> {describe_wish_for_confirmation(wish)}"
+
+
+def _numbered_actions(items: list[NumberedWish], show_actions: bool) -> Any:
+    entries = [(number, int(wish.id)) for number, wish in items if wish.id is not None]
+    if not show_actions or not entries:
+        return None
+    return build_numbered_actions_keyboard(entries)
+
+
+async def _send_text_batch(message: Message, items: list[NumberedWish], show_actions: bool) -> None:
+    """Pack consecutive text cards into as few messages as MAX_MESSAGE_LENGTH allows."""
+    batch: list[NumberedWish] = []
+    blocks: list[str] = []
+    length = 0
+
+    async def flush() -> None:
+        if blocks:
+            markup = _numbered_actions(batch, show_actions)
+            sent = await _send_text(message, "\n\n".join(blocks), reply_markup=markup)
+            if len(batch) == 1:
+                register_wish_messages(batch[0][1], sent)
+            else:
+                register_shared_message(batch, sent, markup)
+            batch.clear()
+            blocks.clear()
+
+    for number, wish in items:
+        block = _numbered_card(number, wish)
+        if blocks and length + 2 + len(block) > MAX_MESSAGE_LENGTH:
+            await flush()
+        length = len(block) if not blocks else length + 2 + len(block)
+        batch.append((number, wish))
+        blocks.append(block)
+    await flush()
+
+
+async def _send_album(message: Message, items: list[NumberedWish], show_actions: bool) -> None:
+    """
+    Send up to MEDIA_GROUP_LIMIT photo wishes as one album.
+
+    Albums cannot carry inline keyboards, so a single follow-up message holds
+    numbered edit/delete buttons, plus any card whose caption was too long.
+    """
+    media: list[InputMediaPhoto] = []
+    sent_items: list[NumberedWish] = []
+    overflow: list[str] = []
+    missing: list[NumberedWish] = []
+    for number, wish in items:
+        source = await _resolve_photo_source(wish)
+        if source is None:
+            missing.append((number, wish))
+            continue
+        caption = _numbered_card(number, wish)
+        if len(caption) > MAX_CAPTION_LENGTH:
+            overflow.append(caption)
+            caption = f"<b>{number}.</b>"
+        media.append(InputMediaPhoto(media=source, caption=caption))
+        sent_items.append((number, wish))
+
+    if len(media) == 1:
+        number, wish = sent_items[0]
+        sent = await _send_photo_with_optional_text(
+            message,
+            wish,
+            _numbered_card(number, wish),
+            _numbered_actions(sent_items, show_actions),
+            media[0].media,
+        )
+        register_wish_messages(wish, sent)
+    elif media:
+        try:
+            sent_album = await _send_with_retry(message.answer_media_group, media)
+        except TelegramBadRequest as exc:
+            logging.warning("Failed to send album of %s photos: %s. Sending cards one by one.", len(media), exc)
+            for number, wish in sent_items:
+                sent = await _send_photo_with_optional_text(
+                    message,
+                    wish,
+                    _numbered_card(number, wish),
+                    _numbered_actions([(number, wish)], show_actions),
+                )
+                register_wish_messages(wish, sent)
+        else:
+            for (_, wish), item, sent in zip(sent_items, media, sent_album or []):
+                await remember_uploaded_photo(wish, item.media, sent)
+                register_wish_messages(wish, [sent])
+            markup = _numbered_actions(sent_items, show_actions)
+            if overflow or markup is not None:
+                text = "\n\n".join(overflow) if overflow else ALBUM_ACTIONS_TEXT
+                register_shared_message(sent_items, await _send_text(message, text, reply_markup=markup), markup)
+
+    if missing:
+        await _send_text_batch(message, missing, show_actions)
+
+
+async def _send_batched(message: Message, wishes: list[Wish], show_actions: bool) -> None:
+    numbered = list(enumerate(wishes, start=1))
+    index = 0
+    while index < len(numbered):
+        is_photo = _has_photo(numbered[index][1])
+        run_end = index
+        while run_end < len(numbered) and _has_photo(numbered[run_end][1]) == is_photo:
+            run_end += 1
+        run = numbered[index:run_end]
+        if is_photo:
+            for offset in range(0, len(run), MEDIA_GROUP_LIMIT):
+                await _send_album(message, run[offset : offset + MEDIA_GROUP_LIMIT], show_actions)
+        else:
+            await _send_text_batch(message, run, show_actions)
+        index = run_end
+
+
+LIST_SCOPE_OWN = "own"
+LIST_SCOPE_PARTNER = "partner"
+LIST_PAGER_TEXT = "↕️ Листайте список кнопками ниже"
+
+
+def _render_compact_page(page: WishPage, *, scope: str, show_actions: bool, title: str) -> tuple[str, Any]:
+    # Rendered in the page's own keyset order: re-sorting a page would let items
+    # jump across page boundaries.
+    numbered = list(enumerate(page.items, start=1))
+    text = "\n".join([title, ""] + [build_compact_wish_line(number, wish) for number, wish in numbered])
+    entries = [(number, int(wish.id)) for number, wish in numbered if wish.id is not None] if show_actions else []
+    markup = build_compact_list_keyboard(
+        scope,
+        entries,
+        first_id=int(page.items[0].id),
+        last_id=int(page.items[-1].id),
+        has_prev=page.has_prev,
+        has_next=page.has_next,
+    )
+    return text, markup
+
+
+async def _send_compact(message: Message, page: WishPage, *, scope: str, show_actions: bool, title: str) -> None:
+    text, markup = _render_compact_page(page, scope=scope, show_actions=show_actions, title=title)
+    if len(text) <= MAX_MESSAGE_LENGTH:
+        await _send_with_retry(message.answer, text, reply_markup=markup)
+        return
+    chunks = _chunk_text(text, MAX_MESSAGE_LENGTH)
+    for index, chunk in enumerate(chunks):
+        await _send_with_retry(message.answer, chunk, reply_markup=markup if index == len(chunks) - 1 else None)
+
+
+async def _deliver_wish_list(
     message: Message,
     wishes: list[Wish],
     empty_text: str,
     *,
     show_actions: bool = True,
     title: str = "📋 Ваш список",
+    mode: str = LIST_DISPLAY_MODE,
+    keep_order: bool = False,
 ) -> None:
     if not wishes:
         await message.answer(empty_text, reply_markup=main_menu_keyboard())
         return
 
+    # Keyset pages and ranked search results keep their order; anything else is grouped for display.
+    ordered = wishes if keep_order else [wish for _, items in sort_wishes_for_display(wishes) for wish in items]
+    if mode == "compact":
+        page = WishPage(items=ordered, has_prev=False, has_next=False)
+        await _send_compact(message, page, scope=LIST_SCOPE_OWN, show_actions=show_actions, title=title)
+        return
+
     await message.answer(title, reply_markup=main_menu_keyboard())
-    for category, items in sort_wishes_for_display(wishes):
-        for wish in items:
-            caption = describe_wish_for_confirmation(wish)
-            keyboard_markup = (
-                build_wish_actions_keyboard(int(wish.id)) if show_actions and wish.id is not None else None
+    # Card-by-card output is bulk traffic: let callback answers and replies to
+    # other users overtake it in the outbound scheduler.
+    with outbound_priority(PRIORITY_LOW):
+        if mode == "batched":
+            await _send_batched(message, ordered, show_actions)
+            return
+        for wish in ordered:
+            await _send_wish_card(message, wish, show_actions)
+
+
+async def _deliver_wish_page(
+    message: Message,
+    page: WishPage,
+    empty_text: str,
+    *,
+    scope: str = LIST_SCOPE_OWN,
+    show_actions: bool = True,
+    title: str = "📋 Ваш список",
+    mode: str = LIST_DISPLAY_MODE,
+) -> None:
+    if mode == "compact" and page.items:
+        await _send_compact(message, page, scope=scope, show_actions=show_actions, title=title)
+        return
+    await _deliver_wish_list(
+        message,
+        page.items,
+        empty_text,
+        show_actions=show_actions,
+        title=title,
+        mode=mode,
+        keep_order=True,
+    )
+    if not page.items or not (page.has_prev or page.has_next):
+        return
+    pager = build_list_pager(
+        scope,
+        int(page.items[0].id),
+        int(page.items[-1].id),
+        has_prev=page.has_prev,
+        has_next=page.has_next,
+    )
+    await _send_with_retry(message.answer, LIST_PAGER_TEXT, reply_markup=pager)
+
+
+async def send_wish_list(
+    message: Message,
+    wishes: list[Wish],
+    empty_text: str,
+    *,
+    show_actions: bool = True,
+    title: str = "📋 Ваш список",
+    mode: str = LIST_DISPLAY_MODE,
+    keep_order: bool = False,
+) -> None:
+    """
+    Queue the list for delivery; returns as soon as it is queued when the send pipeline runs.
+
+    Wishes are grouped by category and priority unless ``keep_order`` is set
+    (e.g. search results already ranked by relevance).
+    """
+    await deliver(
+        message.chat.id,
+        partial(
+            _deliver_wish_list,
+            message,
+            wishes,
+            empty_text,
+            show_actions=show_actions,
+            title=title,
+            mode=mode,
+            keep_order=keep_order,
+        ),
+    )
+
+
+async def send_wish_page(
+    message: Message,
+    page: WishPage,
+    empty_text: str,
+    *,
+    scope: str = LIST_SCOPE_OWN,
+    show_actions: bool = True,
+    title: str = "📋 Ваш список",
+    mode: str = LIST_DISPLAY_MODE,
+) -> None:
+    await deliver(
+        message.chat.id,
+        partial(
+            _deliver_wish_page,
+            message,
+            page,
+            empty_text,
+            scope=scope,
+            show_actions=show_actions,
+            title=title,
+            mode=mode,
+        ),
+    )
+
+
+def _is_not_modified(exc: TelegramBadRequest) -> bool:
+    return "message is not modified" in str(exc)
+
+
+@dataclass(frozen=True, slots=True)
+class CardRef:
+    """Address of an already sent wish card, enough to edit it later (also from FSM data)."""
+
+    chat_id: int
+    message_id: int
+    is_photo: bool
+
+    @classmethod
+    def from_message(cls, message: Any) -> Optional["CardRef"]:
+        if not isinstance(message, Message):
+            return None
+        return cls(chat_id=message.chat.id, message_id=message.message_id, is_photo=bool(message.photo))
+
+    @classmethod
+    def from_state(cls, data: dict[str, Any]) -> Optional["CardRef"]:
+        if data.get("card_message_id") is None or data.get("card_chat_id") is None:
+            return None
+        return cls(
+            chat_id=int(data["card_chat_id"]),
+            message_id=int(data["card_message_id"]),
+            is_photo=bool(data.get("card_is_photo")),
+        )
+
+    def as_state(self) -> dict[str, Any]:
+        return {"card_chat_id": self.chat_id, "card_message_id": self.message_id, "card_is_photo": self.is_photo}
+
+
+async def edit_card_in_place(
+    bot: "Bot",
+    card: CardRef,
+    text: str,
+    reply_markup: Any = None,
+    *,
+    photo: Any = None,
+) -> bool:
+    """
+    Rewrite an already sent card instead of sending a new one.
+
+    Passing ``photo`` replaces the picture as well. Returns False when the edit
+    is impossible (text card that should now show a photo, text over the limit,
+    message too old or gone), in which case the caller sends a new message.
+    """
+    target = {"chat_id": card.chat_id, "message_id": card.message_id}
+    try:
+        if photo is not None:
+            if not card.is_photo:
+                return False
+            caption = text if len(text) <= MAX_CAPTION_LENGTH else None
+            await _send_with_retry(
+                bot.edit_message_media,
+                media=InputMediaPhoto(media=photo, caption=caption),
+                reply_markup=reply_markup,
+                **target,
             )
-            if wish.image_url or wish.image:
-                await _send_photo_with_optional_text(message, wish, caption, keyboard_markup)
-            else:
-                await _send_text(message, caption, reply_markup=keyboard_markup)
+        elif card.is_photo:
+            if len(text) > MAX_CAPTION_LENGTH:
+                return False
+            await _send_with_retry(bot.edit_message_caption, caption=text, reply_markup=reply_markup, **target)
+        else:
+            if len(text) > MAX_MESSAGE_LENGTH:
+                return False
+            await _send_with_retry(bot.edit_message_text, text=text, reply_markup=reply_markup, **target)
+    except TelegramBadRequest as exc:
+        if _is_not_modified(exc):
+            return True
+        logging.info("Cannot edit card %s in place: %s", card.message_id, exc)
+        return False
+    return True
+
+
+async def edit_markup_in_place(bot: "Bot", card: CardRef, reply_markup: Any) -> bool:
+    try:
+        await _send_with_retry(
+            bot.edit_message_reply_markup,
+            chat_id=card.chat_id,
+            message_id=card.message_id,
+            reply_markup=reply_markup,
+        )
+    except TelegramBadRequest as exc:
+        if _is_not_modified(exc):
+            return True
+        logging.info("Cannot edit keyboard of %s in place: %s", card.message_id, exc)
+        return False
+    return True
+
+
+async def edit_wish_page(
+    message: Message,
+    page: WishPage,
+    empty_text: str,
+    *,
+    scope: str = LIST_SCOPE_OWN,
+    show_actions: bool = True,
+    title: str = "📋 Ваш список",
+) -> None:
+    """Re-render a compact list message in place; falls back to sending a new one."""
+    if not page.items:
+        text, markup = empty_text, None
+    else:
+        text, markup = _render_compact_page(page, scope=scope, show_actions=show_actions, title=title)
+    if len(text) <= MAX_MESSAGE_LENGTH:
+        try:
+            await _send_with_retry(message.edit_text, text, reply_markup=markup)
+            return
+        except TelegramBadRequest as exc:
+            if _is_not_modified(exc):
+                return
+            logging.warning("Failed to edit list message %s: %s. Sending a new one.", message.message_id, exc)
+    await send_wish_page(message, page, empty_text, scope=scope, show_actions=show_actions, title=title, mode="compact")
 
 
 def select_other_user(current_user_id: int) -> Optional[int]:
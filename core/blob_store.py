@@ -0,0 +1,97 @@
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """
+    Content-addressed file store for wish photos.
+
+    Every blob is written once under ``root/<first two hex chars>/<sha256>``, so
+    identical photos share a single file. Reads return a read-only memoryview over
+    an mmap of the file, which lets the upload path stream it without copying.
+    """
+
+    def __init__(self, root: Path | str):
+        self._root = Path(root)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def path_for(self, digest: str) -> Path:
+        if not _DIGEST_PATTERN.match(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return self._root / digest[:2] / digest
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes, digest: str | None = None) -> str:
+        """
+        Store the bytes (if not already present) and return their SHA-256 hex digest.
+
+        ``digest`` skips hashing when the caller has already computed it.
+        """
+        digest = digest or self.digest(data)
+        path = self.path_for(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+        return digest
+
+    def read(self, digest: str) -> memoryview | None:
+        path = self.path_for(digest)
+        try:
+            with open(path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return memoryview(b"")
+                # The mapping outlives the file handle and is released together
+                # with the last memoryview that references it.
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        return memoryview(mapped)
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    def delete(self, digest: str) -> bool:
+        """Remove the blob; returns False when it was already gone."""
+        try:
+            self.path_for(digest).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_digests(self) -> Iterator[str]:
+        """Digests of every stored blob; half-written temporary files are skipped."""
+        if not self._root.is_dir():
+            return
+        for bucket in self._root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for path in bucket.iterdir():
+                if _DIGEST_PATTERN.match(path.name):
+                    yield path.name
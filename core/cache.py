@@ -0,0 +1,154 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hit_ratio, 4),
+        }
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU mapping whose entries expire ``ttl`` seconds after being written."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (self._clock() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def discard(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class VersionedCache(Generic[K, V]):
+    """
+    LRU cache bounded by an approximate memory budget instead of an entry count.
+
+    Every entry is tagged with the data version it was read at, and a lookup only
+    hits when the tag matches the caller's current version. A value read by a slow
+    query that overlapped a write is stored under the old version and never served.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        *,
+        sizeof: Callable[[V], int],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: "OrderedDict[K, tuple[int, float, int, V]]" = OrderedDict()
+        self._used_bytes = 0
+        self.stats = CacheStats()
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K, version: int) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        entry_version, expires_at, _, value = entry
+        if entry_version != version or expires_at <= self._clock():
+            self.discard(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def put(self, key: K, version: int, value: V) -> None:
+        current = self._entries.get(key)
+        if current is not None and current[0] > version:
+            return
+        size = self._sizeof(value)
+        self.discard(key)
+        if size > self._max_bytes:
+            return
+        self._entries[key] = (version, self._clock() + self._ttl, size, value)
+        self._used_bytes += size
+        while self._used_bytes > self._max_bytes:
+            _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+            self._used_bytes -= evicted_size
+            self.stats.evictions += 1
+
+    def discard(self, key: K) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._used_bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._used_bytes = 0
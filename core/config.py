@@ -2,7 +2,7 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Optional, Set
+from typing import Any, Dict, Optional, Set
 
 try:
     from dotenv import load_dotenv
@@ -12,6 +12,9 @@ except ImportError:  # pragma: no cover - optional dependency
 
 ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
 ENV_AUTHORIZED_USERS_KEY = "AUTHORIZED_USER_IDS"
+# Файл старого JSON-хранилища; переносится в Postgres через `python -m core.legacy_import`.
+LEGACY_DATA_FILE = ENV_FILE.parent / "wishlist_data.json"
+REQUIRED_DB_ENV_VARS = ["PGUSER", "PGPASSWORD", "PGDATABASE", "PGHOST", "PGPORT"]
 
 
 def load_env_file() -> None:
@@ -66,6 +69,133 @@ if not AUTHORIZED_IDENTIFIERS:
     )
 
 
+def read_int_env(key: str, default: int) -> int:
+    raw = os.getenv(key, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logging.warning("Invalid integer for %s: %r. Using %s.", key, raw, default)
+        return default
+
+
+def read_float_env(key: str, default: float) -> float:
+    raw = os.getenv(key, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logging.warning("Invalid number for %s: %r. Using %s.", key, raw, default)
+        return default
+
+
+def read_bool_env(key: str, default: bool) -> bool:
+    raw = os.getenv(key, "").strip().lower()
+    if not raw:
+        return default
+    return raw in {"1", "true", "yes", "on"}
+
+
+IMAGE_STORE_DIR = Path(
+    os.getenv("IMAGE_STORE_DIR", "").strip() or ENV_FILE.parent / "data" / "images"
+).expanduser()
+
+SESSION_CACHE_TTL_SECONDS = read_float_env("SESSION_CACHE_TTL", 300.0)
+SESSION_CACHE_MAX_ENTRIES = read_int_env("SESSION_CACHE_MAX_ENTRIES", 10_000)
+WISH_CACHE_TTL_SECONDS = read_float_env("WISH_CACHE_TTL", 300.0)
+WISH_CACHE_MAX_BYTES = read_int_env("WISH_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+
+def build_db_config() -> Dict[str, Any]:
+    for var in REQUIRED_DB_ENV_VARS:
+        if not os.getenv(var):
+            raise EnvironmentError(f"Переменная окружения {var} не установлена, но является обязательной.")
+    return {
+        "user": os.getenv("PGUSER"),
+        "password": os.getenv("PGPASSWORD"),
+        "database": os.getenv("PGDATABASE"),
+        "host": os.getenv("PGHOST"),
+        "port": int(os.getenv("PGPORT")),
+    }
+
+
+def build_replica_db_config() -> Optional[Dict[str, Any]]:
+    """Connection settings of the read replica, or None when PGREPLICA_HOST is not set."""
+    host = os.getenv("PGREPLICA_HOST", "").strip()
+    if not host:
+        return None
+    primary = build_db_config()
+    return {
+        "user": os.getenv("PGREPLICA_USER") or primary["user"],
+        "password": os.getenv("PGREPLICA_PASSWORD") or primary["password"],
+        "database": os.getenv("PGREPLICA_DATABASE") or primary["database"],
+        "host": host,
+        "port": read_int_env("PGREPLICA_PORT", primary["port"]),
+    }
+
+
+# Пул соединений (значения по умолчанию совпадают с asyncpg).
+PG_POOL_MIN_SIZE = read_int_env("PG_POOL_MIN_SIZE", 10)
+PG_POOL_MAX_SIZE = read_int_env("PG_POOL_MAX_SIZE", 10)
+PG_STATEMENT_CACHE_SIZE = read_int_env("PG_STATEMENT_CACHE_SIZE", 100)
+PG_MAX_INACTIVE_LIFETIME = read_float_env("PG_MAX_INACTIVE_LIFETIME", 300.0)
+PG_POOL_ADAPTIVE = read_bool_env("PG_POOL_ADAPTIVE", False)
+PG_POOL_ADAPTIVE_WAIT_MS = read_float_env("PG_POOL_ADAPTIVE_WAIT_MS", 50.0)
+PG_POOL_ADAPTIVE_MAX_SIZE = read_int_env("PG_POOL_ADAPTIVE_MAX_SIZE", 40)
+# Сколько соединений старый и новый пул могут держать вместе, пока идёт смена размера.
+PG_POOL_CONNECTION_CEILING = read_int_env("PG_POOL_CONNECTION_CEILING", 80)
+
+# "postgres" (по умолчанию) или "memory" — запуск бота без БД, данные живут до перезапуска.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").strip().lower() or "postgres"
+
+# После своей записи пользователь читает с primary это число секунд (read-your-writes).
+READ_YOUR_WRITES_SECONDS = read_float_env("READ_YOUR_WRITES_SECONDS", 5.0)
+
+# Вывод списка: "cards" — по сообщению на желание, "batched" — альбомы и объединённый текст,
+# "compact" — страница списка в одном сообщении, листание редактирует его.
+LIST_DISPLAY_MODES = ("cards", "batched", "compact")
+LIST_DISPLAY_MODE = os.getenv("LIST_DISPLAY_MODE", "cards").strip().lower() or "cards"
+if LIST_DISPLAY_MODE not in LIST_DISPLAY_MODES:
+    LIST_DISPLAY_MODE = "cards"
+
+
+# Исходящие запросы к Bot API: общий лимит, лимит на чат и на группу, повторы при 429.
+OUTBOUND_SCHEDULER = read_bool_env("OUTBOUND_SCHEDULER", True)
+OUTBOUND_GLOBAL_RATE = read_float_env("OUTBOUND_GLOBAL_RATE", 30.0)
+OUTBOUND_CHAT_RATE = read_float_env("OUTBOUND_CHAT_RATE", 1.0)
+OUTBOUND_CHAT_BURST = read_float_env("OUTBOUND_CHAT_BURST", 3.0)
+OUTBOUND_GROUP_PER_MINUTE = read_float_env("OUTBOUND_GROUP_PER_MINUTE", 20.0)
+OUTBOUND_MAX_RETRIES = read_int_env("OUTBOUND_MAX_RETRIES", 3)
+
+
+# Воркеры очереди отправки списков (параллельно по чатам, по порядку внутри чата); 0 — отправлять сразу.
+SEND_PIPELINE_WORKERS = read_int_env("SEND_PIPELINE_WORKERS", 8)
+
+
+# Редактировать карточку и клавиатуру на месте вместо отправки новых сообщений.
+EDIT_IN_PLACE = read_bool_env("EDIT_IN_PLACE", True)
+
+
+# Кэш отрисованных карточек (ключ — id и содержимое желания), записей на каждый вид.
+RENDER_CACHE_SIZE = read_int_env("RENDER_CACHE_SIZE", 2000)
+
+
+# JSON-файл {"ключевое слово": "эмодзи"}; его записи проверяются раньше встроенных.
+_category_emoji_file = os.getenv("CATEGORY_EMOJI_FILE", "").strip()
+CATEGORY_EMOJI_FILE = Path(_category_emoji_file) if _category_emoji_file else None
+
+
+# Сколько пар (чат, желание) -> сообщения помнить, чтобы при удалении убирать только его карточки.
+MESSAGE_REGISTRY_SIZE = read_int_env("MESSAGE_REGISTRY_SIZE", 10000)
+
+
+# Экспорт: строк за одну выборку курсора и размер файла в памяти до сброса на диск.
+EXPORT_BATCH_SIZE = read_int_env("EXPORT_BATCH_SIZE", 500)
+EXPORT_SPOOL_MAX_BYTES = read_int_env("EXPORT_SPOOL_MAX_BYTES", 1024 * 1024)
+
+
 def ensure_token() -> str:
     token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
     if not token:
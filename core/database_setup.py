@@ -1,34 +1,91 @@
+import asyncio
 import asyncpg
 import logging
+from pathlib import Path
 
-async def create_tables(pool: asyncpg.Pool) -> None:
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+# Arbitrary constant shared by every bot instance so that only one of them migrates at a time.
+MIGRATION_LOCK_ID = 7_426_031
+MIGRATION_LOCK_POLL_INTERVAL = 1.0
+
+
+async def run_migrations(pool: asyncpg.Pool, directory: Path = MIGRATIONS_DIR) -> list[str]:
     """
-    Create all necessary tables in the database.
+    Apply pending schema migrations in file-name order.
+
+    Each ``NNNN_name.sql`` file is applied once and recorded in ``schema_migrations``.
+    Files starting with ``-- migrate: no-transaction`` run outside a transaction, one
+    statement at a time (needed for ``CREATE INDEX CONCURRENTLY``); statements there
+    must end with a semicolon at the end of a line.
 
     Args:
         pool (asyncpg.Pool): The connection pool to the database.
+        directory (Path): Folder holding the migration files.
+
+    Returns:
+        list[str]: Versions applied during this call.
 
     Raises:
-        asyncpg.PostgresError: If there is an error during table creation.
-    """
-    create_wishes_table = """
-    CREATE TABLE IF NOT EXISTS wishes (
-        id SERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        title TEXT NOT NULL,
-        link TEXT,
-        category TEXT,
-        description TEXT,
-        priority INTEGER,
-        image BYTEA,
-        image_url TEXT
-    );
+        asyncpg.PostgresError: If a migration fails. Already applied ones stay recorded.
     """
+    applied_now: list[str] = []
+    async with pool.acquire() as conn:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+            """
+        )
+        await _acquire_migration_lock(conn)
+        try:
+            applied = {row["version"] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+            for path in sorted(directory.glob("*.sql")):
+                version = path.stem
+                if version in applied:
+                    continue
+                sql = path.read_text(encoding="utf-8")
+                try:
+                    if sql.lstrip().startswith(NO_TRANSACTION_MARKER):
+                        for statement in _split_statements(sql):
+                            await conn.execute(statement)
+                        await _record_migration(conn, version)
+                    else:
+                        async with conn.transaction():
+                            await conn.execute(sql)
+                            await _record_migration(conn, version)
+                except asyncpg.PostgresError as e:
+                    logging.error(f"Migration {version} failed: {e}")
+                    raise
+                logging.info("Applied migration %s", version)
+                applied_now.append(version)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+    return applied_now
+
+
+async def _acquire_migration_lock(conn: asyncpg.Connection) -> None:
+    # A session blocked in pg_advisory_lock keeps a snapshot open, and CREATE INDEX
+    # CONCURRENTLY in the lock holder waits for it: poll instead of blocking.
+    while not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MIGRATION_LOCK_ID):
+        logging.info("Waiting for another instance to finish migrations")
+        await asyncio.sleep(MIGRATION_LOCK_POLL_INTERVAL)
+
+
+def _split_statements(sql: str) -> list[str]:
+    statements: list[str] = []
+    current: list[str] = []
+    for line in sql.splitlines():
+        current.append(line)
+        if line.rstrip().endswith(";"):
+            statements.append("\n".join(current))
+            current = []
+    if any(line.strip() and not line.lstrip().startswith("--") for line in current):
+        statements.append("\n".join(current))
+    return statements
+
 
-    try:
-        async with pool.acquire() as conn:
-            await conn.execute(create_wishes_table)
-            logging.info("Tables created successfully.")
-    except asyncpg.PostgresError as e:
-        logging.error(f"Failed to create tables: {e}")
-        raise
+async def _record_migration(conn: asyncpg.Connection, version: str) -> None:
+    await conn.execute("INSERT INTO schema_migrations (version) VALUES ($1)", version)
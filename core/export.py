@@ -0,0 +1,50 @@
+import asyncio
+import gzip
+from tempfile import SpooledTemporaryFile
+from typing import IO, AsyncIterable
+
+from core.config import EXPORT_SPOOL_MAX_BYTES
+
+_WRITE_BATCH_BYTES = 64 * 1024
+
+
+def _finish(output: IO[bytes], data: bytes) -> None:
+    output.write(data)
+    if isinstance(output, gzip.GzipFile):
+        # Writes the gzip trailer; the underlying spool stays open.
+        output.close()
+
+
+async def spool_export(
+    chunks: AsyncIterable[str],
+    *,
+    compress: bool = False,
+    max_memory: int = EXPORT_SPOOL_MAX_BYTES,
+) -> IO[bytes]:
+    """
+    Write streamed export text as UTF-8 into a SpooledTemporaryFile, optionally gzipped.
+
+    The file stays in memory up to ``max_memory`` bytes and moves to disk after
+    that. Text is collected into ~64 KiB batches that are compressed and written
+    in a worker thread, so neither gzip nor disk I/O blocks the event loop. It is
+    returned rewound; the caller closes it.
+    """
+    spool: IO[bytes] = SpooledTemporaryFile(max_size=max_memory)
+    output: IO[bytes] = gzip.GzipFile(fileobj=spool, mode="wb", mtime=0) if compress else spool
+    try:
+        pending: list[bytes] = []
+        pending_size = 0
+        async for chunk in chunks:
+            data = chunk.encode("utf-8")
+            pending.append(data)
+            pending_size += len(data)
+            if pending_size >= _WRITE_BATCH_BYTES:
+                await asyncio.to_thread(output.write, b"".join(pending))
+                pending.clear()
+                pending_size = 0
+        await asyncio.to_thread(_finish, output, b"".join(pending))
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
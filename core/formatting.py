@@ -1,16 +1,27 @@
 import csv
 import io
+import json
+import re
 from collections import defaultdict
+from functools import lru_cache
 from html import escape as html_escape
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from aiogram.types import InputFile, Message
 
+from core.cache import CacheStats, TTLCache
+from core.config import CATEGORY_EMOJI_FILE, RENDER_CACHE_SIZE
 from core.models import Wish
 
 
 DEFAULT_CATEGORY_TITLE = "Без категории"
 DEFAULT_CATEGORY_EMOJI = "📌"
+# Trimmed around category names; the same set as BTRIM(category, E' \t\r\n') in core.storage.
+CATEGORY_TRIM_CHARS = " \t\r\n"
+
+EXPORT_CSV_HEADER = ["Название", "Ссылка", "Категория", "Описание", "Приоритет"]
+IMPORT_DEFAULT_PRIORITY = 3
 
 # Mapping of category keywords to emojis (case-insensitive substring match).
 CATEGORY_EMOJI_MAP = {
@@ -48,21 +59,106 @@ CATEGORY_EMOJI_MAP = {
 }
 
 
+class _EmojiMatcher:
+    """
+    All keywords compiled into one regex, keeping "first keyword in map order wins".
+
+    The alternation sits inside a lookahead, so finditer tries every start
+    position without consuming text. At each position the earliest listed
+    keyword that matches there is reported, and the smallest map index over all
+    positions is the keyword the old linear scan would have picked.
+    """
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        needles = [needle.lower() for needle in mapping if needle]
+        self._emojis = [mapping[needle] for needle in mapping if needle]
+        self._index = {needle: index for index, needle in reversed(list(enumerate(needles)))}
+        pattern = "|".join(re.escape(needle) for needle in needles)
+        self._pattern = re.compile(f"(?=({pattern}))") if needles else None
+
+    def match(self, key: str) -> Optional[str]:
+        if self._pattern is None:
+            return None
+        best: Optional[int] = None
+        for found in self._pattern.finditer(key):
+            index = self._index[found.group(1)]
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return self._emojis[best] if best is not None else None
+
+
+def load_category_emoji_file(path: Path) -> Dict[str, str]:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise RuntimeError(f"Cannot read CATEGORY_EMOJI_FILE {path}: {exc}") from exc
+    if not isinstance(data, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in data.items()):
+        raise RuntimeError(f"CATEGORY_EMOJI_FILE {path} must be a JSON object of keyword -> emoji strings.")
+    return data
+
+
+_emoji_matcher = _EmojiMatcher(CATEGORY_EMOJI_MAP)
+
+
+def configure_category_emoji(custom: Optional[Mapping[str, str]] = None) -> None:
+    """
+    Rebuild the matcher with ``custom`` keywords checked before the built-in map.
+
+    Meant for start-up: rendered cards cached in ui.keyboards keep the emoji
+    they were rendered with.
+    """
+    global _emoji_matcher
+    mapping: Dict[str, str] = {}
+    for needle, emoji in (custom or {}).items():
+        mapping.setdefault(needle.strip().lower(), emoji)
+    for needle, emoji in CATEGORY_EMOJI_MAP.items():
+        mapping.setdefault(needle, emoji)
+    _emoji_matcher = _EmojiMatcher(mapping)
+    _category_key_to_emoji.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def _category_key_to_emoji(key: str) -> str:
+    return _emoji_matcher.match(key) or DEFAULT_CATEGORY_EMOJI
+
+
 def category_to_emoji(category: str) -> str:
     if not category:
         return DEFAULT_CATEGORY_EMOJI
-    key = category.strip().lower()
-    for needle, emoji in CATEGORY_EMOJI_MAP.items():
-        if needle in key:
-            return emoji
-    return DEFAULT_CATEGORY_EMOJI
+    return _category_key_to_emoji(category.strip().lower())
+
+
+if CATEGORY_EMOJI_FILE is not None:
+    configure_category_emoji(load_category_emoji_file(CATEGORY_EMOJI_FILE))
 
 
 def escape_html_text(value: str) -> str:
     return html_escape(value, quote=True) if value else ""
 
 
+# Export blocks, keyed by the wish id plus the fields they show (see ui.keyboards.render_wish_card).
+_block_cache: TTLCache[tuple, str] = TTLCache(max(RENDER_CACHE_SIZE, 1), float("inf"))
+
+
 def build_wish_block(wish: Wish) -> str:
+    key = (wish.id, wish.priority, wish.title, wish.link, wish.description, wish.image_url)
+    use_cache = wish.id is not None and RENDER_CACHE_SIZE > 0
+    cached = _block_cache.get(key) if use_cache else None
+    if cached is not None:
+        return cached
+    block = _render_wish_block(wish)
+    if use_cache:
+        _block_cache.set(key, block)
+    return block
+
+
+def wish_block_cache_stats() -> CacheStats:
+    return _block_cache.stats
+
+
+def _render_wish_block(wish: Wish) -> str:
     lines = [f"({wish.priority}) {escape_html_text(wish.title)}"]
     if wish.link:
         lines.append(f"   🔗 {escape_html_text(wish.link)}")
@@ -76,7 +172,7 @@ def build_wish_block(wish: Wish) -> str:
 def sort_wishes_for_display(wishes: List[Wish]) -> List[Tuple[str, List[Wish]]]:
     grouped: Dict[str, List[Wish]] = defaultdict(list)
     for wish in wishes:
-        category = wish.category.strip() if wish.category else ""
+        category = wish.category.strip(CATEGORY_TRIM_CHARS) if wish.category else ""
         category = category or DEFAULT_CATEGORY_TITLE
         grouped[category].append(wish)
 
@@ -107,15 +203,7 @@ def compose_export_txt(wishes: List[Wish]) -> str:
 def compose_export_csv(wishes: List[Wish]) -> str:
     output = io.StringIO()
     writer = csv.writer(output)
-    writer.writerow(
-        [
-          "Название",
-          "Ссылка",
-          "Категория",
-          "Описание",
-          "Приоритет",
-        ]
-    )
+    writer.writerow(EXPORT_CSV_HEADER)
     for wish in wishes:
         writer.writerow(
             [
@@ -129,6 +217,95 @@ def compose_export_csv(wishes: List[Wish]) -> str:
     return output.getvalue()
 
 
+_EXPORT_CHUNK_CHARS = 64 * 1024
+
+
+def _export_group(wish: Wish) -> str:
+    return (wish.category.strip(CATEGORY_TRIM_CHARS) if wish.category else "") or DEFAULT_CATEGORY_TITLE
+
+
+async def iter_export_txt(wishes: AsyncIterable[Wish]) -> AsyncIterator[str]:
+    """
+    Streaming form of compose_export_txt for wishes that arrive already grouped.
+
+    Yields the same text as compose_export_txt would for those wishes, holding
+    only one block at a time. The last block is held back because the output
+    is right-stripped.
+    """
+    current: Optional[str] = None
+    pending: Optional[str] = None
+    async for wish in wishes:
+        if pending is not None:
+            yield pending
+        category = _export_group(wish)
+        if category != current:
+            emoji = category_to_emoji(category if category != DEFAULT_CATEGORY_TITLE else "")
+            separator = "" if current is None else "\n\n\n"
+            yield f"{separator}{emoji} {category}\n"
+            current = category
+        else:
+            yield "\n\n"
+        pending = build_wish_block(wish)
+    if pending is None:
+        yield "Список желаний пуст.\n"
+        return
+    yield pending.rstrip() + "\n"
+
+
+async def iter_export_csv(wishes: AsyncIterable[Wish]) -> AsyncIterator[str]:
+    """Streaming form of compose_export_csv, flushed roughly every 64 KiB."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_HEADER)
+    async for wish in wishes:
+        writer.writerow([wish.title, wish.link, wish.category, wish.description, wish.priority])
+        if buffer.tell() >= _EXPORT_CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _parse_import_row(row: List[str]) -> Tuple[Optional[Wish], Optional[str]]:
+    if len(row) != len(EXPORT_CSV_HEADER):
+        return None, f"ожидалось {len(EXPORT_CSV_HEADER)} колонок, получено {len(row)}"
+    title, link, category, description, raw_priority = (value.strip() for value in row)
+    if not title:
+        return None, "пустое название"
+    if link and not link.lower().startswith(("http://", "https://")):
+        return None, "ссылка должна начинаться с http:// или https://"
+    priority = IMPORT_DEFAULT_PRIORITY
+    if raw_priority:
+        if not raw_priority.isdigit() or not 1 <= int(raw_priority) <= 5:
+            return None, "приоритет должен быть числом от 1 до 5"
+        priority = int(raw_priority)
+    wish = Wish(
+        title=title,
+        link=link or None,
+        category=category or None,
+        description=description or None,
+        priority=priority,
+    )
+    return wish, None
+
+
+def parse_import_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[Wish], Optional[str]]]:
+    """
+    Inverse of compose_export_csv: lazily yield (line number, wish, error) per data row.
+
+    Exactly one of wish/error is set, so a bad row is reported without aborting the
+    rest of the file. The export header row is optional and skipped.
+    """
+    reader = csv.reader(lines)
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if reader.line_num == 1 and [cell.strip() for cell in row] == EXPORT_CSV_HEADER:
+            continue
+        wish, error = _parse_import_row(row)
+        yield reader.line_num, wish, error
+
+
 async def send_wish_list(message: Message, wishes: List[Wish], footer: str) -> None:
     for wish in wishes:
         if wish.image_url:
@@ -0,0 +1,287 @@
+"""
+One-shot migration of the legacy ``wishlist_data.json`` store into Postgres.
+
+Usage: ``python -m core.legacy_import [path] [--batch-size N] [--restart]``
+
+The file is parsed incrementally, so only the record being decoded is held in
+memory. Records are bulk-loaded with COPY, one transaction per batch, and every
+transaction also stores how many records of the file have been processed. An
+interrupted run therefore resumes right after the last committed batch.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterator, Optional, TextIO
+
+import asyncpg
+
+from core.config import LEGACY_DATA_FILE, build_db_config
+from core.database_setup import run_migrations
+from core.formatting import IMPORT_DEFAULT_PRIORITY
+from core.models import Wish
+from core.storage import WISH_INSERT_COLUMNS
+
+DEFAULT_BATCH_SIZE = 1000
+_CHUNK_SIZE = 64 * 1024
+_DECODER = json.JSONDecoder()
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _JsonReader:
+    """Minimal pull parser: walks containers by hand and decodes leaf values with raw_decode."""
+
+    def __init__(self, handle: TextIO, chunk_size: int = _CHUNK_SIZE):
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found or 'end of file'!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the buffer boundary ("2." or "1e") decodes as a shorter number.
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                tail = end
+                while tail < len(self._buffer) and self._buffer[tail] in _NUMBER_CHARS:
+                    tail += 1
+                if tail == len(self._buffer) and self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """Yield keys one by one; the caller must consume each value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield str(key)
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+# Keys whose object maps user ids to their data, like the top level itself.
+_OWNER_CONTAINERS = frozenset({"users"})
+
+
+def _is_user_key(key: str) -> bool:
+    return key.lstrip("-").isdigit()
+
+
+def _walk(
+    reader: _JsonReader,
+    owner: Optional[str],
+    *,
+    keys_are_owners: bool = False,
+) -> Iterator[tuple[Optional[str], Any]]:
+    marker = reader.peek()
+    if marker == "{":
+        for key in reader.iter_object_keys():
+            if owner is not None:
+                if _is_user_key(key) and reader.peek() == "{":
+                    # A wish map keyed by wish id: each value is one record.
+                    yield owner, reader.value()
+                else:
+                    yield from _walk(reader, owner)
+            elif keys_are_owners and _is_user_key(key):
+                yield from _walk(reader, key)
+            else:
+                yield from _walk(reader, None, keys_are_owners=key in _OWNER_CONTAINERS)
+    elif marker == "[":
+        for item in reader.iter_array():
+            yield owner, item
+    else:
+        reader.value()
+
+
+def iter_legacy_records(handle: TextIO, *, chunk_size: int = _CHUNK_SIZE) -> Iterator[tuple[Optional[str], Any]]:
+    """
+    Yield (owner id, raw record) for every wish in the legacy store.
+
+    Supports ``{"<user_id>": [...]}`` as well as nested layouts such as
+    ``{"users": {"<user_id>": {"wishes": [...]}}}``. Only keys at those two owner
+    positions are read as user ids; below an owner, wishes may come as an array
+    or as an object keyed by wish id.
+    """
+    yield from _walk(_JsonReader(handle, chunk_size), None, keys_are_owners=True)
+
+
+def _optional_text(*values: Any) -> Optional[str]:
+    for value in values:
+        if value:
+            return str(value)
+    return None
+
+
+def record_to_wish(record: Any) -> Optional[Wish]:
+    if not isinstance(record, dict):
+        return None
+    title = str(record.get("title") or record.get("name") or "").strip()
+    if not title:
+        return None
+    try:
+        priority = min(max(int(record.get("priority")), 1), 5)
+    except (TypeError, ValueError):
+        priority = IMPORT_DEFAULT_PRIORITY
+    return Wish(
+        title=title,
+        link=_optional_text(record.get("link"), record.get("url")),
+        category=_optional_text(record.get("category")),
+        description=_optional_text(record.get("description")),
+        priority=priority,
+        image_url=_optional_text(record.get("image_url"), record.get("file_id")),
+    )
+
+
+async def _commit_batch(conn: asyncpg.Connection, source: str, records: list[tuple], position: int) -> None:
+    async with conn.transaction():
+        if records:
+            await conn.copy_records_to_table("wishes", records=records, columns=WISH_INSERT_COLUMNS)
+        await conn.execute(
+            """
+            INSERT INTO legacy_import_progress (source, records_done, updated_at)
+            VALUES ($1, $2, NOW())
+            ON CONFLICT (source)
+            DO UPDATE
+            SET records_done = EXCLUDED.records_done,
+                updated_at = NOW()
+            """,
+            source,
+            position,
+        )
+
+
+async def migrate_legacy_file(
+    pool: asyncpg.Pool,
+    path: Path,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False,
+) -> int:
+    """
+    Load every wish of the legacy JSON file into ``wishes``.
+
+    Args:
+        pool (asyncpg.Pool): The connection pool to the database.
+        path (Path): Legacy JSON store.
+        batch_size (int): Records per COPY transaction.
+        restart (bool): Ignore the saved checkpoint and start from the first record.
+
+    Returns:
+        int: Number of wishes inserted by this run.
+    """
+    source = str(path.resolve())
+    inserted = 0
+    skipped = 0
+    async with pool.acquire() as conn:
+        if restart:
+            await conn.execute("DELETE FROM legacy_import_progress WHERE source = $1", source)
+        done = await conn.fetchval(
+            "SELECT records_done FROM legacy_import_progress WHERE source = $1",
+            source,
+        ) or 0
+        if done:
+            logging.info("Resuming %s after record %s", path, done)
+
+        position = 0
+        batch: list[tuple] = []
+        with path.open(encoding="utf-8") as handle:
+            for owner, record in iter_legacy_records(handle):
+                position += 1
+                if position <= done:
+                    continue
+                wish = record_to_wish(record)
+                if owner is None or wish is None:
+                    skipped += 1
+                    logging.warning("Skipping legacy record #%s: no owner or title", position)
+                else:
+                    batch.append((int(owner), *wish.as_tuple()))
+                if position - done >= batch_size:
+                    await _commit_batch(conn, source, batch, position)
+                    inserted += len(batch)
+                    done = position
+                    batch = []
+                    logging.info("Imported %s legacy records so far", inserted)
+        if position > done:
+            await _commit_batch(conn, source, batch, position)
+            inserted += len(batch)
+
+    logging.info("Legacy import finished: %s inserted, %s skipped", inserted, skipped)
+    return inserted
+
+
+async def _main(args: argparse.Namespace) -> None:
+    pool = await asyncpg.create_pool(**build_db_config())
+    try:
+        await run_migrations(pool)
+        await migrate_legacy_file(pool, args.path, batch_size=args.batch_size, restart=args.restart)
+    finally:
+        await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Перенос старого wishlist_data.json в PostgreSQL.")
+    parser.add_argument("path", nargs="?", type=Path, default=LEGACY_DATA_FILE)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="начать заново, игнорируя сохранённую позицию")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
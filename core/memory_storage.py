@@ -0,0 +1,230 @@
+import hashlib
+from dataclasses import replace
+from typing import Any, AsyncGenerator, Iterable, Optional
+
+from core.config import EXPORT_BATCH_SIZE
+from core.formatting import CATEGORY_TRIM_CHARS, sort_wishes_for_display
+from core.models import CategorySummary, Wish, WishPage
+from core.storage import (
+    LIST_PAGE_SIZE,
+    PATCHABLE_WISH_FIELDS,
+    SEARCH_RESULT_LIMIT,
+    SEARCH_TERM_PATTERN,
+    PageCursor,
+)
+
+
+def _page_key(category: Optional[str], priority: Optional[int], wish_id: int) -> tuple[str, str, int, int]:
+    return (category or "").lower(), category or "", -(priority or 0), wish_id
+
+
+class InMemoryStorage:
+    """
+    Process-local implementation of StorageProtocol for tests, load runs and benchmarks.
+
+    Mirrors ``Storage`` observably: ids are assigned sequentially, every read and
+    RETURNING-style result is a fresh Wish copy with user_id/has_image filled in,
+    photos are deduplicated by SHA-256 and lists use the same keyset order. A
+    stored wish may still carry legacy inline ``image`` bytes, like an unmigrated
+    row. The only difference is the order of category groups in iter_wishes,
+    which follows the database locale in Postgres.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[int, bool] = {}
+        # Per-user index: user_id -> wish_id -> stored Wish (never handed out directly).
+        self._wishes: dict[int, dict[int, Wish]] = {}
+        self._blobs: dict[str, bytes] = {}
+        self._next_id = 1
+
+    async def set_session_state(self, user_id: int, is_active: bool) -> None:
+        self._sessions[user_id] = is_active
+
+    async def mark_session_active(self, user_id: int) -> None:
+        await self.set_session_state(user_id, True)
+
+    async def mark_session_inactive(self, user_id: int) -> None:
+        await self.set_session_state(user_id, False)
+
+    async def is_session_active(self, user_id: int) -> bool:
+        return self._sessions.get(user_id, False)
+
+    @staticmethod
+    def _copy(wish: Wish) -> Wish:
+        return replace(wish, image=None, has_image=wish.image_hash is not None or wish.image is not None)
+
+    def _sorted(self, user_id: int) -> list[Wish]:
+        items = self._wishes.get(user_id, {}).values()
+        return sorted(items, key=lambda wish: _page_key(wish.category, wish.priority, int(wish.id)))
+
+    def _store_image(self, image_bytes: bytes | None) -> str | None:
+        if not image_bytes:
+            return None
+        data = bytes(image_bytes)
+        digest = hashlib.sha256(data).hexdigest()
+        self._blobs.setdefault(digest, data)
+        return digest
+
+    def _release_image(self, digest: str | None) -> None:
+        if digest is None:
+            return
+        if not any(wish.image_hash == digest for wishes in self._wishes.values() for wish in wishes.values()):
+            self._blobs.pop(digest, None)
+
+    async def list_wishes(self, user_id: int) -> list[Wish]:
+        return [self._copy(wish) for wish in self._sorted(user_id)]
+
+    async def iter_wishes(self, user_id: int, *, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncGenerator[Wish, None]:
+        for _, items in sort_wishes_for_display(self._sorted(user_id)):
+            for wish in items:
+                yield self._copy(wish)
+
+    async def collect_categories(self, user_id: int) -> list[CategorySummary]:
+        summaries: dict[str, CategorySummary] = {}
+        for wish in self._wishes.get(user_id, {}).values():
+            name = (wish.category or "").strip(CATEGORY_TRIM_CHARS)
+            if not name:
+                continue
+            summary = summaries.setdefault(name, CategorySummary(name=name, count=0))
+            summary.count += 1
+            if wish.priority is not None and (summary.max_priority is None or wish.priority > summary.max_priority):
+                summary.max_priority = wish.priority
+        return sorted(summaries.values(), key=lambda summary: (summary.name.lower(), summary.name))
+
+    async def list_wishes_page(
+        self,
+        user_id: int,
+        *,
+        after: PageCursor | None = None,
+        before: PageCursor | None = None,
+        limit: int = LIST_PAGE_SIZE,
+    ) -> WishPage:
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both.")
+        ordered = self._sorted(user_id)
+        keys = [_page_key(wish.category, wish.priority, int(wish.id)) for wish in ordered]
+
+        if before is not None:
+            bound = _page_key(before[0], before[1], int(before[2]))
+            preceding = [wish for wish, key in zip(ordered, keys) if key < bound]
+            items = [self._copy(wish) for wish in preceding[-limit:]]
+            return WishPage(items=items, has_prev=len(preceding) > limit, has_next=True)
+
+        if after is not None:
+            bound = _page_key(after[0], after[1], int(after[2]))
+            ordered = [wish for wish, key in zip(ordered, keys) if key > bound]
+        items = [self._copy(wish) for wish in ordered[:limit]]
+        return WishPage(items=items, has_prev=after is not None, has_next=len(ordered) > limit)
+
+    async def search_wishes(self, user_id: int, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[Wish]:
+        terms = SEARCH_TERM_PATTERN.findall(query.lower())
+        if not terms:
+            return []
+        ranked: list[tuple[int, Wish]] = []
+        for wish in self._wishes.get(user_id, {}).values():
+            words = SEARCH_TERM_PATTERN.findall(f"{wish.title or ''} {wish.description or ''}".lower())
+            if not all(any(word.startswith(term) for word in words) for term in terms):
+                continue
+            rank = sum(1 for word in words if any(word.startswith(term) for term in terms))
+            ranked.append((rank, wish))
+        ranked.sort(key=lambda item: (-item[0], -(item[1].priority if item[1].priority is not None else -1), item[1].id))
+        return [self._copy(wish) for _, wish in ranked[:limit]]
+
+    def _insert(self, user_id: int, wish: Wish) -> None:
+        stored = replace(wish, id=self._next_id, user_id=user_id, image=None, has_image=False)
+        self._next_id += 1
+        self._wishes.setdefault(user_id, {})[int(stored.id)] = stored
+
+    async def add_wish(self, user_id: int, wish: Wish) -> None:
+        if wish.image:
+            wish.image_hash = self._store_image(wish.image)
+        self._insert(user_id, wish)
+
+    async def add_wishes_bulk(self, user_id: int, wishes: Iterable[Wish]) -> int:
+        # Like COPY, nothing is stored when the iterable fails half way.
+        batch = list(wishes)
+        for wish in batch:
+            self._insert(user_id, wish)
+        return len(batch)
+
+    async def find_wish(self, user_id: int, wish_id: int) -> Wish | None:
+        wish = self._wishes.get(user_id, {}).get(int(wish_id))
+        return self._copy(wish) if wish is not None else None
+
+    async def load_wish_image(self, user_id: int, wish_id: int) -> memoryview | bytes | None:
+        wish = self._wishes.get(user_id, {}).get(int(wish_id))
+        if wish is None:
+            return None
+        if wish.image_hash is None:
+            return wish.image
+        data = self._blobs.get(wish.image_hash)
+        return memoryview(data) if data is not None else None
+
+    async def patch_wish(self, user_id: int, wish_id: int, **fields: Any) -> Wish | None:
+        unknown = set(fields) - PATCHABLE_WISH_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown wish fields: {', '.join(sorted(unknown))}")
+        wish = self._wishes.get(user_id, {}).get(int(wish_id))
+        if wish is None:
+            return None
+        previous_hash = wish.image_hash
+        if "image_bytes" in fields:
+            fields["image_hash"] = self._store_image(fields.pop("image_bytes"))
+            fields["image"] = None
+        for name, value in fields.items():
+            setattr(wish, name, value)
+        if wish.image_hash != previous_hash:
+            self._release_image(previous_hash)
+        return self._copy(wish)
+
+    async def remember_image_file_id(
+        self,
+        user_id: int,
+        wish_id: int,
+        file_id: str,
+        *,
+        image_hash: str | None,
+    ) -> bool:
+        wish = self._wishes.get(user_id, {}).get(int(wish_id))
+        if wish is None or wish.image_url is not None:
+            return False
+        if image_hash is not None:
+            matches = wish.image_hash == image_hash
+        else:
+            matches = wish.image_hash is None and wish.image is not None
+        if not matches:
+            return False
+        wish.image_url = file_id
+        return True
+
+    async def update_wish_title(self, user_id: int, wish_id: int, title: str) -> Wish | None:
+        return await self.patch_wish(user_id, wish_id, title=title)
+
+    async def update_wish_url(self, user_id: int, wish_id: int, url: str | None) -> Wish | None:
+        return await self.patch_wish(user_id, wish_id, link=url)
+
+    async def clear_wish_url(self, user_id: int, wish_id: int) -> Wish | None:
+        return await self.update_wish_url(user_id, wish_id, None)
+
+    async def update_wish_priority(self, user_id: int, wish_id: int, priority: int) -> Wish | None:
+        return await self.patch_wish(user_id, wish_id, priority=priority)
+
+    async def update_wish_photo(
+        self,
+        user_id: int,
+        wish_id: int,
+        *,
+        file_id: str,
+        image_bytes: bytes | None,
+    ) -> Wish | None:
+        return await self.patch_wish(user_id, wish_id, image_url=file_id, image_bytes=image_bytes)
+
+    async def clear_wish_photo(self, user_id: int, wish_id: int) -> Wish | None:
+        return await self.patch_wish(user_id, wish_id, image_url=None, image_bytes=None)
+
+    async def delete_wish(self, user_id: int, wish_id: int) -> bool:
+        wish = self._wishes.get(user_id, {}).pop(int(wish_id), None)
+        if wish is None:
+            return False
+        self._release_image(wish.image_hash)
+        return True
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS wishes (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    category TEXT,
+    description TEXT,
+    priority INTEGER,
+    image BYTEA,
+    image_url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS user_sessions (
+    user_id BIGINT PRIMARY KEY,
+    is_active BOOLEAN NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,2 @@
+-- Photos live in the content-addressed BlobStore; the row keeps only the SHA-256.
+ALTER TABLE wishes ADD COLUMN IF NOT EXISTS image_hash TEXT;
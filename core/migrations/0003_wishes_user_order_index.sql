@@ -0,0 +1,14 @@
+-- migrate: no-transaction
+-- Serves list_wishes and the keyset pages of list_wishes_page (category ASC, priority DESC, id).
+-- Categories compare case-insensitively, then by code point (COLLATE "C"), independent of
+-- the database locale; the expressions must match _PAGE_KEY_PARTS in core.storage.
+-- A failed concurrent build leaves an INVALID index behind; drop it so the retry rebuilds it.
+DROP INDEX CONCURRENTLY IF EXISTS wishes_user_order_idx;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS wishes_user_order_idx
+    ON wishes (
+        user_id,
+        (lower(COALESCE(category, ''))) COLLATE "C",
+        (COALESCE(category, '')) COLLATE "C",
+        (-COALESCE(priority, 0)),
+        id
+    );
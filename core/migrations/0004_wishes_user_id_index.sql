@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Point lookups by (user_id, id): find_wish, load_wish_image, update_wish_*, delete_wish.
+DROP INDEX CONCURRENTLY IF EXISTS wishes_user_id_idx;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS wishes_user_id_idx
+    ON wishes (user_id, id);
@@ -0,0 +1,6 @@
+-- Checkpoints of `python -m core.legacy_import`, committed together with each COPY batch.
+CREATE TABLE IF NOT EXISTS legacy_import_progress (
+    source TEXT PRIMARY KEY,
+    records_done BIGINT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
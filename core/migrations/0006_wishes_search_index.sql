@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- Expression index for Storage.search_wishes; the query must repeat this expression verbatim.
+-- 'simple' keeps words unstemmed, so mixed Russian/English titles match the same way.
+DROP INDEX CONCURRENTLY IF EXISTS wishes_search_idx;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS wishes_search_idx
+    ON wishes USING GIN (to_tsvector('simple', COALESCE(title, '') || ' ' || COALESCE(description, '')));
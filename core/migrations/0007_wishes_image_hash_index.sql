@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Reference checks before a blob file is deleted (Storage._release_images).
+DROP INDEX CONCURRENTLY IF EXISTS wishes_image_hash_idx;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS wishes_image_hash_idx
+    ON wishes (image_hash) WHERE image_hash IS NOT NULL;
@@ -12,13 +12,36 @@ class Wish:
     image: Optional[bytes] = None
     image_url: Optional[str] = None
     id: Optional[int] = None
+    user_id: Optional[int] = None
+    # SHA-256 файла в BlobStore; сами байты в строке wishes больше не хранятся.
+    image_hash: Optional[str] = None
+    # Списки и карточки грузятся без байтов изображения; флаг говорит, есть ли они в БД.
+    has_image: bool = False
 
     def as_tuple(self) -> Tuple[Union[str, None], ...]:
         """Порядок соответствует колонкам INSERT в БД."""
         return (
-            self.title, self.link, self.category, self.description, self.priority, self.image, self.image_url
+            self.title, self.link, self.category, self.description, self.priority, self.image_hash, self.image_url
         )
 
+    def page_key(self) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+        """Ключ keyset-пагинации: (категория, приоритет, id) в порядке сортировки списка."""
+        return self.category, self.priority, self.id
+
+
+@dataclass(slots=True)
+class CategorySummary:
+    name: str
+    count: int
+    max_priority: Optional[int] = None
+
+
+@dataclass(slots=True)
+class WishPage:
+    items: List[Wish]
+    has_prev: bool = False
+    has_next: bool = False
+
 
 Store = Dict[str, Any]
 WishList = List[Wish]
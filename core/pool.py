@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+import asyncpg
+
+from core.config import (
+    PG_MAX_INACTIVE_LIFETIME,
+    PG_POOL_CONNECTION_CEILING,
+    PG_POOL_ADAPTIVE,
+    PG_POOL_ADAPTIVE_MAX_SIZE,
+    PG_POOL_ADAPTIVE_WAIT_MS,
+    PG_POOL_MAX_SIZE,
+    PG_POOL_MIN_SIZE,
+    PG_STATEMENT_CACHE_SIZE,
+)
+
+_EXHAUSTION_LOG_INTERVAL = 60.0
+_RESIZE_COOLDOWN = 30.0
+
+
+@dataclass(slots=True)
+class PoolSettings:
+    min_size: int = PG_POOL_MIN_SIZE
+    max_size: int = PG_POOL_MAX_SIZE
+    statement_cache_size: int = PG_STATEMENT_CACHE_SIZE
+    max_inactive_connection_lifetime: float = PG_MAX_INACTIVE_LIFETIME
+    adaptive: bool = PG_POOL_ADAPTIVE
+    adaptive_wait_threshold: float = PG_POOL_ADAPTIVE_WAIT_MS / 1000
+    adaptive_max_size: int = PG_POOL_ADAPTIVE_MAX_SIZE
+    adaptive_step: int = 5
+    connection_ceiling: int = PG_POOL_CONNECTION_CEILING
+
+
+@dataclass(slots=True)
+class PoolStats:
+    acquisitions: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    in_use: int = 0
+    peak_in_use: int = 0
+    exhausted: int = 0
+    resizes: int = 0
+    max_size: int = 0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.acquisitions if self.acquisitions else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {field.name: getattr(self, field.name) for field in fields(self)}
+        result["mean_wait_ms"] = round(self.mean_wait * 1000, 3)
+        result["max_wait_ms"] = round(self.max_wait * 1000, 3)
+        del result["total_wait"], result["max_wait"]
+        return result
+
+
+class InstrumentedPool:
+    """
+    asyncpg pool wrapper that measures how long callers wait in ``acquire()``.
+
+    It tracks connections in use and counts acquisitions that found the pool
+    exhausted. In adaptive mode, waits above the threshold trigger a resize: a
+    larger pool is created and swapped in, and the old one is closed once every
+    caller that borrowed from it or was still queued on it is done (asyncpg
+    cannot grow a pool in place). Both pools are open while the old one drains,
+    so the new size is capped to keep their connections together under
+    ``connection_ceiling``.
+    """
+
+    def __init__(self, connect_kwargs: Dict[str, Any], settings: Optional[PoolSettings] = None, *, name: str = "primary"):
+        self._connect_kwargs = connect_kwargs
+        self._settings = settings or PoolSettings()
+        self._name = name
+        self._pool: Optional[asyncpg.Pool] = None
+        # Callers holding or waiting for a connection, per underlying pool.
+        self._users: Dict[asyncpg.Pool, int] = {}
+        self._drained: Dict[asyncpg.Pool, asyncio.Event] = {}
+        self._max_size = self._settings.max_size
+        self._resize_task: Optional[asyncio.Task[None]] = None
+        self._last_resize_at = 0.0
+        self._last_exhaustion_log_at = 0.0
+        self.stats = PoolStats(max_size=self._max_size)
+
+    async def _create(self, max_size: int) -> asyncpg.Pool:
+        return await asyncpg.create_pool(
+            **self._connect_kwargs,
+            min_size=min(self._settings.min_size, max_size),
+            max_size=max_size,
+            statement_cache_size=self._settings.statement_cache_size,
+            max_inactive_connection_lifetime=self._settings.max_inactive_connection_lifetime,
+        )
+
+    async def start(self) -> "InstrumentedPool":
+        self._pool = await self._create(self._max_size)
+        return self
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        if self._pool is None:
+            raise RuntimeError(f"Pool {self._name!r} is not started.")
+        pool = self._pool
+        if self.stats.in_use >= self._max_size:
+            self._record_exhaustion()
+        self._users[pool] = self._users.get(pool, 0) + 1
+        try:
+            started = time.perf_counter()
+            async with pool.acquire() as conn:
+                waited = time.perf_counter() - started
+                stats = self.stats
+                stats.acquisitions += 1
+                stats.total_wait += waited
+                stats.max_wait = max(stats.max_wait, waited)
+                stats.in_use += 1
+                stats.peak_in_use = max(stats.peak_in_use, stats.in_use)
+                if self._settings.adaptive and waited > self._settings.adaptive_wait_threshold:
+                    self._maybe_grow()
+                try:
+                    yield conn
+                finally:
+                    stats.in_use -= 1
+        finally:
+            self._release_user(pool)
+
+    def _release_user(self, pool: asyncpg.Pool) -> None:
+        remaining = self._users[pool] - 1
+        if remaining:
+            self._users[pool] = remaining
+            return
+        del self._users[pool]
+        drained = self._drained.get(pool)
+        if drained is not None:
+            drained.set()
+
+    def _record_exhaustion(self) -> None:
+        self.stats.exhausted += 1
+        now = time.monotonic()
+        if now - self._last_exhaustion_log_at >= _EXHAUSTION_LOG_INTERVAL:
+            self._last_exhaustion_log_at = now
+            logging.warning(
+                "Pool %s exhausted: %s/%s connections in use, callers are queueing",
+                self._name,
+                self.stats.in_use,
+                self._max_size,
+            )
+
+    def _maybe_grow(self) -> None:
+        if self._resize_task is not None and not self._resize_task.done():
+            return
+        if self._max_size >= self._settings.adaptive_max_size:
+            return
+        if time.monotonic() - self._last_resize_at < _RESIZE_COOLDOWN:
+            return
+        new_size = min(self._max_size + self._settings.adaptive_step, self._settings.adaptive_max_size)
+        self._resize_task = asyncio.create_task(self._grow(new_size))
+
+    async def _grow(self, new_size: int) -> None:
+        self._last_resize_at = time.monotonic()
+        old_size = self._pool.get_size() if self._pool is not None else 0
+        new_size = min(new_size, self._settings.connection_ceiling - old_size)
+        if new_size <= self._max_size:
+            logging.warning(
+                "Pool %s not grown: %s open connections leave no room under the ceiling of %s",
+                self._name,
+                old_size,
+                self._settings.connection_ceiling,
+            )
+            return
+        try:
+            new_pool = await self._create(new_size)
+        except (OSError, asyncpg.PostgresError) as exc:
+            logging.error("Failed to grow pool %s to %s connections: %s", self._name, new_size, exc)
+            return
+        old_pool, self._pool = self._pool, new_pool
+        logging.info("Pool %s grown from %s to %s connections", self._name, self._max_size, new_size)
+        self._max_size = new_size
+        self.stats.max_size = new_size
+        self.stats.resizes += 1
+        if old_pool is not None:
+            await self._close_when_drained(old_pool)
+
+    async def _close_when_drained(self, pool: asyncpg.Pool) -> None:
+        # Closing while callers are still queued on the old pool would fail their acquire().
+        if self._users.get(pool):
+            drained = self._drained[pool] = asyncio.Event()
+            try:
+                await drained.wait()
+            finally:
+                del self._drained[pool]
+        await pool.close()
+
+    async def close(self) -> None:
+        if self._resize_task is not None:
+            await asyncio.gather(self._resize_task, return_exceptions=True)
+        if self._pool is not None:
+            await self._pool.close()
+
+
+PoolLike = Union[asyncpg.Pool, InstrumentedPool]
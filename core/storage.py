@@ -1,27 +1,337 @@
+import asyncio
 import logging
-from typing import Any, Optional
+import re
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Iterable, Optional
 
 import asyncpg
 
-from core.models import Wish
+from core.blob_store import BlobStore
+from core.cache import CacheStats, TTLCache, VersionedCache
+from core.config import (
+    EXPORT_BATCH_SIZE,
+    IMAGE_STORE_DIR,
+    READ_YOUR_WRITES_SECONDS,
+    SESSION_CACHE_MAX_ENTRIES,
+    SESSION_CACHE_TTL_SECONDS,
+    WISH_CACHE_MAX_BYTES,
+    WISH_CACHE_TTL_SECONDS,
+)
+from core.formatting import DEFAULT_CATEGORY_TITLE
+from core.models import CategorySummary, Wish, WishPage
+from core.pool import PoolLike
+
+# Projection used by every read and RETURNING clause. The image bytes are never
+# selected here; callers that really need them go through load_wish_image.
+_WISH_COLUMNS = """
+    id, user_id, title, link, category, description, priority, image_hash,
+    (image_hash IS NOT NULL OR image IS NOT NULL) AS has_image, image_url
+"""
+
+WISH_INSERT_COLUMNS = (
+    "user_id", "title", "link", "category", "description", "priority", "image_hash", "image_url",
+)
+
+# Total order used by keyset pagination: category ASC (case-insensitive, then
+# exact), priority DESC, id ASC. NULLs are folded so that the key can be compared
+# as a single row value, and categories compare by code point ("C") so the order
+# does not depend on the database locale and matches InMemoryStorage.
+_PAGE_KEY_PARTS = (
+    "lower(COALESCE(category, '')) COLLATE \"C\"",
+    "COALESCE(category, '') COLLATE \"C\"",
+    "-COALESCE(priority, 0)",
+    "id",
+)
+_PAGE_KEY = ", ".join(_PAGE_KEY_PARTS)
+
+PageCursor = tuple[Optional[str], Optional[int], int]
+_PageCacheKey = tuple[int, Optional[PageCursor], Optional[PageCursor], int]
+
+# Export order: the groups of core.formatting.sort_wishes_for_display (trimmed
+# category, empty ones under DEFAULT_CATEGORY_TITLE), highest priority first.
+# Groups are contiguous; their relative order follows the database collation.
+_CATEGORY_NAME = "btrim(category, E' \\t\\r\\n')"
+_EXPORT_GROUP = f"COALESCE(NULLIF({_CATEGORY_NAME}, ''), $2::text)"
+_EXPORT_ORDER = f"lower({_EXPORT_GROUP}), {_EXPORT_GROUP}, priority DESC NULLS LAST, id"
+# Must match the expression of wishes_search_idx (migration 0006) for the index to be used.
+_SEARCH_DOCUMENT = "to_tsvector('simple', COALESCE(title, '') || ' ' || COALESCE(description, ''))"
+
+IMAGE_MIGRATION_BATCH_SIZE = 500
+IMAGE_SWEEP_BATCH_SIZE = 500
+LIST_PAGE_SIZE = 10
+SEARCH_RESULT_LIMIT = 20
+
+# Letters and digits, split on everything else (underscore included), like the
+# 'simple' text search parser; InMemoryStorage tokenises wishes the same way.
+SEARCH_TERM_PATTERN = re.compile(r"[^\W_]+")
+
+PATCHABLE_WISH_FIELDS = frozenset(
+    {"title", "link", "category", "description", "priority", "image_url", "image_bytes"}
+)
+
+
+@lru_cache(maxsize=128)
+def _build_patch_query(columns: tuple[str, ...]) -> str:
+    assignments = [f"{column} = ${index}" for index, column in enumerate(columns, start=3)]
+    if "image_hash" not in columns:
+        return f"""
+            UPDATE wishes
+            SET {", ".join(assignments)}
+            WHERE user_id = $1 AND id = $2
+            RETURNING {_WISH_COLUMNS}
+        """
+    # Replacing the photo also drops any legacy inline bytes, and returns the old
+    # hash so that its blob can be released.
+    assignments.append("image = NULL")
+    return f"""
+        UPDATE wishes
+        SET {", ".join(assignments)}
+        FROM (
+            SELECT image_hash AS previous_image_hash
+            FROM wishes
+            WHERE user_id = $1 AND id = $2
+            FOR UPDATE
+        ) AS previous
+        WHERE user_id = $1 AND id = $2
+        RETURNING {_WISH_COLUMNS}, previous.previous_image_hash
+    """
+
+
+def _blob_lock_key(digest: str) -> int:
+    # The first 60 bits of the digest: a positive bigint for pg_advisory_xact_lock.
+    return int(digest[:15], 16)
+
+
+# Rough per-object overhead of a Wish and its attribute slots, in bytes.
+_WISH_BASE_SIZE = 200
+
+
+def _estimate_categories_size(categories: list[CategorySummary]) -> int:
+    return sum(_WISH_BASE_SIZE + len(category.name) for category in categories)
+
+
+def _estimate_wishes_size(wishes: list[Wish]) -> int:
+    size = 0
+    for wish in wishes:
+        size += _WISH_BASE_SIZE
+        for value in (wish.title, wish.link, wish.category, wish.description, wish.image_url, wish.image_hash):
+            if value:
+                size += len(value)
+    return size
+
+
+def _estimate_page_size(page: WishPage) -> int:
+    return _estimate_wishes_size(page.items)
+
+
+def _copy_page(page: WishPage) -> WishPage:
+    # Wish is mutable (callers fill in image_url after an upload), so the cache
+    # never shares its objects with callers.
+    return WishPage(items=[replace(wish) for wish in page.items], has_prev=page.has_prev, has_next=page.has_next)
 
 
 class Storage:
-    def __init__(self, pool: asyncpg.Pool):
+    def __init__(
+        self,
+        pool: PoolLike,
+        *,
+        replica_pool: PoolLike | None = None,
+        read_your_writes_window: float = READ_YOUR_WRITES_SECONDS,
+        blob_store: BlobStore | None = None,
+        session_cache_ttl: float = SESSION_CACHE_TTL_SECONDS,
+        session_cache_size: int = SESSION_CACHE_MAX_ENTRIES,
+        wish_cache_ttl: float = WISH_CACHE_TTL_SECONDS,
+        wish_cache_max_bytes: int = WISH_CACHE_MAX_BYTES,
+    ):
         self._pool = pool
+        # Read-only queries go to the replica unless the data owner wrote recently:
+        # then they stay on the primary so users always see their own changes.
+        self._replica_pool = replica_pool
+        self._read_your_writes_window = read_your_writes_window
+        # Ordered oldest write first, so expired entries are pruned from the front.
+        self._last_write_at: OrderedDict[int, float] = OrderedDict()
+        self._blob_store = blob_store or BlobStore(IMAGE_STORE_DIR)
+        # Write-through cache of user_sessions.is_active. Every write goes through
+        # set_session_state, so entries only go stale if another process changes
+        # the table directly; the TTL bounds that window.
+        self._session_cache: TTLCache[int, bool] = TTLCache(session_cache_size, session_cache_ttl)
+        # Bumped by every set_session_state, so a cache fill whose read started
+        # before a later write is dropped instead of caching the older state.
+        self._session_generations: dict[int, int] = {}
+        # Materialized list pages per (user, cursor, limit). Each write bumps the
+        # owner's version, which makes every cached page of that user miss until
+        # it is re-read; stale pages then age out of the LRU.
+        self._user_versions: dict[int, int] = {}
+        self._wish_page_cache: VersionedCache[_PageCacheKey, WishPage] = VersionedCache(
+            wish_cache_max_bytes,
+            wish_cache_ttl,
+            sizeof=_estimate_page_size,
+        )
+        self._category_cache: VersionedCache[int, list[CategorySummary]] = VersionedCache(
+            max(wish_cache_max_bytes // 8, 1),
+            wish_cache_ttl,
+            sizeof=_estimate_categories_size,
+        )
 
-    async def ensure_session_schema(self) -> None:
-        """Ensure the auxiliary table for user session tracking exists."""
-        async with self._pool.acquire() as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS user_sessions (
-                    user_id BIGINT PRIMARY KEY,
-                    is_active BOOLEAN NOT NULL,
-                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    def session_cache_stats(self) -> CacheStats:
+        return self._session_cache.stats
+
+    def wish_list_cache_stats(self) -> CacheStats:
+        return self._wish_page_cache.stats
+
+    def _read_pool(self, user_id: int) -> PoolLike:
+        if self._replica_pool is None:
+            return self._pool
+        written_at = self._last_write_at.get(user_id)
+        if written_at is not None:
+            if time.monotonic() - written_at < self._read_your_writes_window:
+                return self._pool
+            del self._last_write_at[user_id]
+        return self._replica_pool
+
+    def _mark_write(self, user_id: int) -> None:
+        if self._replica_pool is None:
+            return
+        now = time.monotonic()
+        self._last_write_at[user_id] = now
+        self._last_write_at.move_to_end(user_id)
+        # Users who write and never read again would otherwise stay here forever.
+        while self._last_write_at:
+            oldest_user, written_at = next(iter(self._last_write_at.items()))
+            if now - written_at < self._read_your_writes_window:
+                break
+            del self._last_write_at[oldest_user]
+
+    def _data_version(self, user_id: int) -> int:
+        return self._user_versions.get(user_id, 0)
+
+    def _invalidate_user(self, user_id: int) -> None:
+        self._user_versions[user_id] = self._data_version(user_id) + 1
+        self._mark_write(user_id)
+        self._category_cache.discard(user_id)
+
+    async def migrate_inline_images(self, batch_size: int = IMAGE_MIGRATION_BATCH_SIZE) -> int:
+        """
+        Move legacy BYTEA photos into the blob store, one row per transaction.
+
+        Batches of ids walk the table, so each one starts where the previous
+        ended instead of rescanning from the top; the photos themselves are
+        loaded one at a time, as inline images can be megabytes each. The blob
+        is written inside the row's transaction under its advisory lock, so an
+        interrupted run only leaves files that the next run deduplicates (or
+        sweep_orphan_images removes). Safe to run while the bot serves requests:
+        rows whose photo was replaced in the meantime are left alone. Returns
+        the number of migrated rows.
+        """
+        moved = 0
+        last_id = 0
+        while True:
+            touched_users: set[int] = set()
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT id, user_id
+                    FROM wishes
+                    WHERE id > $1 AND image IS NOT NULL
+                    ORDER BY id
+                    LIMIT $2
+                    """,
+                    last_id,
+                    batch_size,
                 )
-                """
-            )
+                if not rows:
+                    return moved
+                last_id = rows[-1]["id"]
+                for row in rows:
+                    async with conn.transaction():
+                        image = await conn.fetchval(
+                            "SELECT image FROM wishes WHERE id = $1 AND image IS NOT NULL AND image_hash IS NULL",
+                            row["id"],
+                        )
+                        if image is None:
+                            continue
+                        digest = await self._put_image_locked(conn, image)
+                        status = await conn.execute(
+                            """
+                            UPDATE wishes
+                            SET image_hash = $2,
+                                image = NULL
+                            WHERE id = $1 AND image IS NOT NULL AND image_hash IS NULL
+                            """,
+                            row["id"],
+                            digest,
+                        )
+                    if status == "UPDATE 1":
+                        moved += 1
+                        touched_users.add(row["user_id"])
+            for user_id in touched_users:
+                self._invalidate_user(user_id)
+            logging.info("Moved %s inline images to %s so far", moved, self._blob_store.root)
+
+    async def _put_image_locked(self, conn: asyncpg.Connection, image_bytes: bytes | None) -> str | None:
+        """
+        Write a blob inside ``conn``'s open transaction, holding its advisory lock.
+
+        The lock stays held until the row that references the blob commits, so
+        _release_images cannot delete the file in between.
+        """
+        if not image_bytes:
+            return None
+        # asyncpg already hands BYTEA over as bytes; only views need a copy.
+        data = image_bytes if isinstance(image_bytes, bytes) else bytes(image_bytes)
+        digest = await asyncio.to_thread(BlobStore.digest, data)
+        await conn.execute("SELECT pg_advisory_xact_lock($1)", _blob_lock_key(digest))
+        return await asyncio.to_thread(self._blob_store.put, data, digest)
+
+    async def _release_images(self, digests: Iterable[str | None]) -> int:
+        """
+        Delete the blobs of ``digests`` that no wish references any more.
+
+        Each check runs under the blob's advisory lock, so a photo that is being
+        stored for another wish at the same time is never removed. Failures are
+        only logged: the caller's write already succeeded and sweep_orphan_images
+        catches what is left behind. Returns the number of deleted files.
+        """
+        pending = sorted({digest for digest in digests if digest})
+        if not pending:
+            return 0
+        removed = 0
+        try:
+            async with self._pool.acquire() as conn:
+                for digest in pending:
+                    async with conn.transaction():
+                        await conn.execute("SELECT pg_advisory_xact_lock($1)", _blob_lock_key(digest))
+                        referenced = await conn.fetchval(
+                            "SELECT EXISTS (SELECT 1 FROM wishes WHERE image_hash = $1)",
+                            digest,
+                        )
+                        if not referenced and await asyncio.to_thread(self._blob_store.delete, digest):
+                            removed += 1
+        except (asyncpg.PostgresError, OSError) as exc:
+            logging.warning("Failed to release unused images: %s", exc)
+        return removed
+
+    async def sweep_orphan_images(self, batch_size: int = IMAGE_SWEEP_BATCH_SIZE) -> int:
+        """
+        Delete blob files that no wish references, e.g. after a crash between
+        storing a photo and committing its row. Returns the number of deleted files.
+        """
+        digests = await asyncio.to_thread(lambda: list(self._blob_store.iter_digests()))
+        removed = 0
+        for start in range(0, len(digests), batch_size):
+            batch = digests[start : start + batch_size]
+            async with self._pool.acquire() as conn:
+                rows = await conn.fetch(
+                    "SELECT DISTINCT image_hash FROM wishes WHERE image_hash = ANY($1::text[])",
+                    batch,
+                )
+            referenced = {row["image_hash"] for row in rows}
+            removed += await self._release_images(digest for digest in batch if digest not in referenced)
+        return removed
 
     async def set_session_state(self, user_id: int, is_active: bool) -> None:
         """Persist the desired session state for a given user."""
@@ -38,6 +348,9 @@ class Storage:
                 user_id,
                 is_active,
             )
+        self._mark_write(user_id)
+        self._session_generations[user_id] = self._session_generations.get(user_id, 0) + 1
+        self._session_cache.set(user_id, is_active)
 
     async def mark_session_active(self, user_id: int) -> None:
         await self.set_session_state(user_id, True)
@@ -47,7 +360,11 @@ class Storage:
 
     async def is_session_active(self, user_id: int) -> bool:
         """Return True when a persisted session token exists for the user."""
-        async with self._pool.acquire() as conn:
+        cached = self._session_cache.get(user_id)
+        if cached is not None:
+            return cached
+        generation = self._session_generations.get(user_id, 0)
+        async with self._read_pool(user_id).acquire() as conn:
             row = await conn.fetchrow(
                 """
                 SELECT is_active
@@ -56,9 +373,10 @@ class Storage:
                 """,
                 user_id,
             )
-            if row is None:
-                return False
-            return bool(row["is_active"])
+        is_active = row is not None and bool(row["is_active"])
+        if self._session_generations.get(user_id, 0) == generation:
+            self._session_cache.set(user_id, is_active)
+        return is_active
 
     @staticmethod
     def _row_to_wish(row: Optional[asyncpg.Record]) -> Wish | None:
@@ -66,29 +384,25 @@ class Storage:
             return None
         return Wish(
             id=row["id"],
+            user_id=row["user_id"],
             title=row["title"],
             link=row["link"],
             category=row["category"],
             description=row["description"],
             priority=row["priority"],
-            image=row["image"],
+            image_hash=row["image_hash"],
             image_url=row["image_url"],
+            has_image=row["has_image"],
         )
 
-    async def _update_and_fetch(self, query: str, *args: Any) -> Wish | None:
-        async with self._pool.acquire() as conn:
-            async with conn.transaction():
-                row = await conn.fetchrow(query, *args)
-        return self._row_to_wish(row)
-
     async def list_wishes(self, user_id: int) -> list[Wish]:
-        async with self._pool.acquire() as conn:
+        async with self._read_pool(user_id).acquire() as conn:
             rows = await conn.fetch(
-                """
-                SELECT id, title, link, category, description, priority, image, image_url
+                f"""
+                SELECT {_WISH_COLUMNS}
                 FROM wishes
                 WHERE user_id = $1
-                ORDER BY category, priority DESC
+                ORDER BY {_PAGE_KEY}
                 """,
                 user_id,
             )
@@ -99,6 +413,139 @@ class Storage:
                 wishes.append(wish)
         return wishes
 
+    async def iter_wishes(self, user_id: int, *, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncGenerator[Wish, None]:
+        """
+        Stream all of a user's wishes in export order through a server-side cursor.
+
+        Rows arrive ``batch_size`` at a time, without image bytes, and bypass the
+        page cache, so memory stays flat however long the list is.
+        """
+        async with self._read_pool(user_id).acquire() as conn:
+            async with conn.transaction(readonly=True):
+                cursor = conn.cursor(
+                    f"""
+                    SELECT {_WISH_COLUMNS}
+                    FROM wishes
+                    WHERE user_id = $1
+                    ORDER BY {_EXPORT_ORDER}
+                    """,
+                    user_id,
+                    DEFAULT_CATEGORY_TITLE,
+                    prefetch=batch_size,
+                )
+                async for row in cursor:
+                    wish = self._row_to_wish(row)
+                    if wish is not None:
+                        yield wish
+
+    async def collect_categories(self, user_id: int) -> list[CategorySummary]:
+        """Distinct non-empty categories of the user with item counts and the highest priority."""
+        version = self._data_version(user_id)
+        cached = self._category_cache.get(user_id, version)
+        if cached is not None:
+            return [replace(category) for category in cached]
+        async with self._read_pool(user_id).acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {_CATEGORY_NAME} AS name, COUNT(*) AS count, MAX(priority) AS max_priority
+                FROM wishes
+                WHERE user_id = $1 AND COALESCE({_CATEGORY_NAME}, '') <> ''
+                GROUP BY {_CATEGORY_NAME}
+                ORDER BY lower({_CATEGORY_NAME}) COLLATE "C", {_CATEGORY_NAME} COLLATE "C"
+                """,
+                user_id,
+            )
+        categories = [
+            CategorySummary(name=row["name"], count=row["count"], max_priority=row["max_priority"])
+            for row in rows
+        ]
+        self._category_cache.put(user_id, version, [replace(category) for category in categories])
+        return categories
+
+    async def list_wishes_page(
+        self,
+        user_id: int,
+        *,
+        after: PageCursor | None = None,
+        before: PageCursor | None = None,
+        limit: int = LIST_PAGE_SIZE,
+    ) -> WishPage:
+        """
+        Return one page of the user's list using keyset pagination.
+
+        ``after``/``before`` are (category, priority, id) of the last/first wish of the
+        neighbouring page, as returned by Wish.page_key(). Each call reads at most
+        ``limit + 1`` rows no matter how long the list is.
+        """
+        if after is not None and before is not None:
+            raise ValueError("Pass either after or before, not both.")
+
+        cache_key = (user_id, after, before, limit)
+        version = self._data_version(user_id)
+        cached = self._wish_page_cache.get(cache_key, version)
+        if cached is not None:
+            return _copy_page(cached)
+
+        cursor = after if after is not None else before
+        args: list[Any] = [user_id]
+        condition = ""
+        if cursor is not None:
+            category, priority, wish_id = cursor
+            operator = ">" if after is not None else "<"
+            condition = f"AND ({_PAGE_KEY}) {operator} (lower($2::text), $2::text, $3::int, $4::int)"
+            args.extend([category or "", -(priority or 0), int(wish_id)])
+        direction = "DESC" if before is not None else "ASC"
+        order_by = ", ".join(f"{part} {direction}" for part in _PAGE_KEY_PARTS)
+        args.append(limit + 1)
+
+        async with self._read_pool(user_id).acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {_WISH_COLUMNS}
+                FROM wishes
+                WHERE user_id = $1 {condition}
+                ORDER BY {order_by}
+                LIMIT ${len(args)}
+                """,
+                *args,
+            )
+
+        has_more = len(rows) > limit
+        items = [wish for wish in map(self._row_to_wish, rows[:limit]) if wish is not None]
+        if before is not None:
+            items.reverse()
+            page = WishPage(items=items, has_prev=has_more, has_next=True)
+        else:
+            page = WishPage(items=items, has_prev=after is not None, has_next=has_more)
+        self._wish_page_cache.put(cache_key, version, _copy_page(page))
+        return page
+
+    async def search_wishes(self, user_id: int, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[Wish]:
+        """
+        Full-text search over title and description, best matches first.
+
+        Every word of the query must match the beginning of a word in the wish, so
+        "наушн" finds "Наушники". Backed by the GIN expression index wishes_search_idx.
+        """
+        terms = SEARCH_TERM_PATTERN.findall(query.lower())
+        if not terms:
+            return []
+        ts_query = " & ".join(f"{term}:*" for term in terms)
+        async with self._read_pool(user_id).acquire() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {_WISH_COLUMNS}
+                FROM wishes, to_tsquery('simple', $2) AS query
+                WHERE user_id = $1 AND {_SEARCH_DOCUMENT} @@ query
+                ORDER BY ts_rank_cd({_SEARCH_DOCUMENT}, query) DESC, priority DESC NULLS LAST, id
+                LIMIT $3
+                """,
+                user_id,
+                ts_query,
+                limit,
+            )
+        return [wish for wish in map(self._row_to_wish, rows) if wish is not None]
+
     async def add_wish(self, user_id: int, wish: Wish) -> None:
         """
         Add a new wish to the database.
@@ -110,26 +557,55 @@ class Storage:
         Raises:
             asyncpg.PostgresError: If there is an error during the database operation.
         """
+        stored_hash = None
         try:
             async with self._pool.acquire() as conn:
-                await conn.execute(
-                    """
-                    INSERT INTO wishes (user_id, title, link, category, description, priority, image, image_url)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                    """,
-                    user_id,
-                    *wish.as_tuple(),
-                )
+                # Only a new photo needs the transaction that holds its blob lock.
+                async with conn.transaction() if wish.image else nullcontext():
+                    if wish.image:
+                        stored_hash = wish.image_hash = await self._put_image_locked(conn, wish.image)
+                    await conn.execute(
+                        """
+                        INSERT INTO wishes (user_id, title, link, category, description, priority, image_hash, image_url)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                        """,
+                        user_id,
+                        *wish.as_tuple(),
+                    )
         except asyncpg.PostgresError as exc:
             logging.error("Failed to add wish for user %s: %s", user_id, exc)
+            await self._release_images([stored_hash])
             raise
+        self._invalidate_user(user_id)
+
+    async def add_wishes_bulk(self, user_id: int, wishes: Iterable[Wish]) -> int:
+        """
+        Insert many wishes with a single COPY round trip.
+
+        ``wishes`` is consumed lazily, so a streaming parser can feed it directly.
+        Image bytes are not supported here; only already stored hashes and file ids.
+        Returns the number of inserted rows.
+        """
+        records = ((user_id, *wish.as_tuple()) for wish in wishes)
+        try:
+            async with self._pool.acquire() as conn:
+                status = await conn.copy_records_to_table(
+                    "wishes",
+                    records=records,
+                    columns=WISH_INSERT_COLUMNS,
+                )
+        except asyncpg.PostgresError as exc:
+            logging.error("Failed to bulk insert wishes for user %s: %s", user_id, exc)
+            raise
+        self._invalidate_user(user_id)
+        return int(status.split()[-1])
 
     async def find_wish(self, user_id: int, wish_id: int) -> Wish | None:
         wish_id = int(wish_id)
-        async with self._pool.acquire() as conn:
+        async with self._read_pool(user_id).acquire() as conn:
             row = await conn.fetchrow(
-                """
-                SELECT id, title, link, category, description, priority, image, image_url
+                f"""
+                SELECT {_WISH_COLUMNS}
                 FROM wishes
                 WHERE user_id = $1 AND id = $2
                 """,
@@ -138,47 +614,111 @@ class Storage:
             )
         return self._row_to_wish(row)
 
+    async def load_wish_image(self, user_id: int, wish_id: int) -> memoryview | bytes | None:
+        """
+        Fetch the stored image only when a photo really has to be re-uploaded.
+
+        Blob-store images come back as an mmap-backed memoryview; rows that have not
+        been migrated yet still return their inline bytes.
+        """
+        async with self._read_pool(user_id).acquire() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT image_hash, image
+                FROM wishes
+                WHERE user_id = $1 AND id = $2
+                """,
+                user_id,
+                int(wish_id),
+            )
+        if row is None:
+            return None
+        if row["image_hash"]:
+            image = await asyncio.to_thread(self._blob_store.read, row["image_hash"])
+            if image is None:
+                logging.warning("Blob %s for wish %s is missing", row["image_hash"], wish_id)
+            return image
+        return row["image"]
+
+    async def patch_wish(self, user_id: int, wish_id: int, **fields: Any) -> Wish | None:
+        """
+        Update any subset of wish fields with a single UPDATE ... RETURNING.
+
+        Accepts title, link, category, description, priority, image_url and
+        image_bytes (stored in the blob store and saved as image_hash; the replaced
+        blob is deleted once nothing references it). The SQL text is cached per
+        field combination, so asyncpg reuses its prepared statement.
+        """
+        unknown = set(fields) - PATCHABLE_WISH_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown wish fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return await self.find_wish(user_id, wish_id)
+        replaces_image = "image_bytes" in fields
+        image_bytes = fields.pop("image_bytes", None)
+        columns = tuple(sorted({*fields, "image_hash"} if replaces_image else fields))
+        query = _build_patch_query(columns)
+        async with self._pool.acquire() as conn:
+            # Without a new photo a single UPDATE ... RETURNING is atomic on its own;
+            # no BEGIN/COMMIT round trips.
+            async with conn.transaction() if replaces_image else nullcontext():
+                if replaces_image:
+                    fields["image_hash"] = await self._put_image_locked(conn, image_bytes)
+                row = await conn.fetchrow(query, user_id, int(wish_id), *(fields[column] for column in columns))
+        if row is None:
+            if replaces_image:
+                await self._release_images([fields["image_hash"]])
+            return None
+        self._invalidate_user(user_id)
+        if replaces_image and row["previous_image_hash"] != row["image_hash"]:
+            await self._release_images([row["previous_image_hash"]])
+        return self._row_to_wish(row)
+
+    async def remember_image_file_id(
+        self,
+        user_id: int,
+        wish_id: int,
+        file_id: str,
+        *,
+        image_hash: str | None,
+    ) -> bool:
+        """
+        Store the Telegram file_id of a photo that was just uploaded from stored bytes.
+
+        Later sends reference the file by id instead of uploading it again. The
+        update only applies while the wish still has no file_id and still points at
+        the same stored image, so a photo changed or removed meanwhile is not
+        overwritten with a stale id.
+        """
+        async with self._pool.acquire() as conn:
+            result = await conn.execute(
+                """
+                UPDATE wishes
+                SET image_url = $3
+                WHERE user_id = $1 AND id = $2 AND image_url IS NULL
+                  AND (image_hash = $4 OR ($4::text IS NULL AND image_hash IS NULL AND image IS NOT NULL))
+                """,
+                user_id,
+                int(wish_id),
+                file_id,
+                image_hash,
+            )
+        updated = result == "UPDATE 1"
+        if updated:
+            self._invalidate_user(user_id)
+        return updated
+
     async def update_wish_title(self, user_id: int, wish_id: int, title: str) -> Wish | None:
-        return await self._update_and_fetch(
-            """
-            UPDATE wishes
-            SET title = $3
-            WHERE user_id = $1 AND id = $2
-            RETURNING id, title, link, category, description, priority, image, image_url
-            """,
-            user_id,
-            wish_id,
-            title,
-        )
+        return await self.patch_wish(user_id, wish_id, title=title)
 
     async def update_wish_url(self, user_id: int, wish_id: int, url: str | None) -> Wish | None:
-        return await self._update_and_fetch(
-            """
-            UPDATE wishes
-            SET link = $3
-            WHERE user_id = $1 AND id = $2
-            RETURNING id, title, link, category, description, priority, image, image_url
-            """,
-            user_id,
-            wish_id,
-            url,
-        )
+        return await self.patch_wish(user_id, wish_id, link=url)
 
     async def clear_wish_url(self, user_id: int, wish_id: int) -> Wish | None:
         return await self.update_wish_url(user_id, wish_id, None)
 
     async def update_wish_priority(self, user_id: int, wish_id: int, priority: int) -> Wish | None:
-        return await self._update_and_fetch(
-            """
-            UPDATE wishes
-            SET priority = $3
-            WHERE user_id = $1 AND id = $2
-            RETURNING id, title, link, category, description, priority, image, image_url
-            """,
-            user_id,
-            wish_id,
-            priority,
-        )
+        return await self.patch_wish(user_id, wish_id, priority=priority)
 
     async def update_wish_photo(
         self,
@@ -188,41 +728,24 @@ class Storage:
         file_id: str,
         image_bytes: bytes | None,
     ) -> Wish | None:
-        return await self._update_and_fetch(
-            """
-            UPDATE wishes
-            SET image_url = $3,
-                image = $4
-            WHERE user_id = $1 AND id = $2
-            RETURNING id, title, link, category, description, priority, image, image_url
-            """,
-            user_id,
-            wish_id,
-            file_id,
-            image_bytes,
-        )
+        return await self.patch_wish(user_id, wish_id, image_url=file_id, image_bytes=image_bytes)
 
     async def clear_wish_photo(self, user_id: int, wish_id: int) -> Wish | None:
-        return await self._update_and_fetch(
-            """
-            UPDATE wishes
-            SET image_url = NULL,
-                image = NULL
-            WHERE user_id = $1 AND id = $2
-            RETURNING id, title, link, category, description, priority, image, image_url
-            """,
-            user_id,
-            wish_id,
-        )
+        return await self.patch_wish(user_id, wish_id, image_url=None, image_bytes=None)
 
     async def delete_wish(self, user_id: int, wish_id: int) -> bool:
         async with self._pool.acquire() as conn:
-            result = await conn.execute(
+            row = await conn.fetchrow(
                 """
                 DELETE FROM wishes
                 WHERE user_id = $1 AND id = $2
+                RETURNING image_hash
                 """,
                 user_id,
                 wish_id,
             )
-        return result == "DELETE 1"
+        if row is None:
+            return False
+        self._invalidate_user(user_id)
+        await self._release_images([row["image_hash"]])
+        return True
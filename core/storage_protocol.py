@@ -0,0 +1,74 @@
+from typing import Any, AsyncGenerator, Iterable, Protocol
+
+from core.config import EXPORT_BATCH_SIZE
+from core.models import CategorySummary, Wish, WishPage
+from core.storage import LIST_PAGE_SIZE, SEARCH_RESULT_LIMIT, PageCursor
+
+
+class StorageProtocol(Protocol):
+    """Operations the bot needs from a storage backend (Postgres ``Storage`` or ``InMemoryStorage``)."""
+
+    async def set_session_state(self, user_id: int, is_active: bool) -> None: ...
+
+    async def mark_session_active(self, user_id: int) -> None: ...
+
+    async def mark_session_inactive(self, user_id: int) -> None: ...
+
+    async def is_session_active(self, user_id: int) -> bool: ...
+
+    async def list_wishes(self, user_id: int) -> list[Wish]: ...
+
+    def iter_wishes(self, user_id: int, *, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncGenerator[Wish, None]: ...
+
+    async def collect_categories(self, user_id: int) -> list[CategorySummary]: ...
+
+    async def list_wishes_page(
+        self,
+        user_id: int,
+        *,
+        after: PageCursor | None = None,
+        before: PageCursor | None = None,
+        limit: int = LIST_PAGE_SIZE,
+    ) -> WishPage: ...
+
+    async def search_wishes(self, user_id: int, query: str, limit: int = SEARCH_RESULT_LIMIT) -> list[Wish]: ...
+
+    async def add_wish(self, user_id: int, wish: Wish) -> None: ...
+
+    async def add_wishes_bulk(self, user_id: int, wishes: Iterable[Wish]) -> int: ...
+
+    async def find_wish(self, user_id: int, wish_id: int) -> Wish | None: ...
+
+    async def load_wish_image(self, user_id: int, wish_id: int) -> memoryview | bytes | None: ...
+
+    async def patch_wish(self, user_id: int, wish_id: int, **fields: Any) -> Wish | None: ...
+
+    async def remember_image_file_id(
+        self,
+        user_id: int,
+        wish_id: int,
+        file_id: str,
+        *,
+        image_hash: str | None,
+    ) -> bool: ...
+
+    async def update_wish_title(self, user_id: int, wish_id: int, title: str) -> Wish | None: ...
+
+    async def update_wish_url(self, user_id: int, wish_id: int, url: str | None) -> Wish | None: ...
+
+    async def clear_wish_url(self, user_id: int, wish_id: int) -> Wish | None: ...
+
+    async def update_wish_priority(self, user_id: int, wish_id: int, priority: int) -> Wish | None: ...
+
+    async def update_wish_photo(
+        self,
+        user_id: int,
+        wish_id: int,
+        *,
+        file_id: str,
+        image_bytes: bytes | None,
+    ) -> Wish | None: ...
+
+    async def clear_wish_photo(self, user_id: int, wish_id: int) -> Wish | None: ...
+
+    async def delete_wish(self, user_id: int, wish_id: int) -> bool: ...
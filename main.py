@@ -1,51 +1,124 @@
 import asyncio
 import logging
-import os
-from pathlib import Path
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
-import asyncpg
 from dotenv import load_dotenv
 
+from bot.outbound import OutboundScheduler
 from bot.routes import register_routes
-from core.config import ensure_token
+from bot.send_pipeline import ChatOrderMiddleware, SendPipeline, get_send_pipeline, set_send_pipeline
+from core.formatting import wish_block_cache_stats
+from core.config import (
+    OUTBOUND_SCHEDULER,
+    SEND_PIPELINE_WORKERS,
+    STORAGE_BACKEND,
+    build_db_config,
+    build_replica_db_config,
+    ensure_token,
+)
+from core.database_setup import run_migrations
+from core.memory_storage import InMemoryStorage
+from core.pool import InstrumentedPool
 from core.storage import Storage
+from ui.keyboards import card_render_cache_stats
 
 logging.basicConfig(level=logging.INFO)
 
-DATA_FILE = Path(__file__).with_name("wishlist_data.json")
-
 bot = Bot(token=ensure_token(), default=DefaultBotProperties(parse_mode="HTML"))
 dp = Dispatcher()
+# Registered first so calls take their place in the chat's queue before pacing.
+bot.session.middleware(ChatOrderMiddleware())
+outbound = OutboundScheduler() if OUTBOUND_SCHEDULER else None
+if outbound is not None:
+    bot.session.middleware(outbound)
 
 load_dotenv()
 
-required_env_vars = ["PGUSER", "PGPASSWORD", "PGDATABASE", "PGHOST", "PGPORT"]
-for var in required_env_vars:
-    if not os.getenv(var):
-        raise EnvironmentError(f"Переменная окружения {var} не установлена, но является обязательной.")
-
-DB_CONFIG = {
-    "user": os.getenv("PGUSER"),
-    "password": os.getenv("PGPASSWORD"),
-    "database": os.getenv("PGDATABASE"),
-    "host": os.getenv("PGHOST"),
-    "port": int(os.getenv("PGPORT"))  # Удалено значение по умолчанию
-}
 
 async def create_pool():
-    return await asyncpg.create_pool(**DB_CONFIG)
+    return await InstrumentedPool(build_db_config(), name="primary").start()
+
+
+async def create_replica_pool():
+    replica_config = build_replica_db_config()
+    if replica_config is None:
+        return None
+    return await InstrumentedPool(replica_config, name="replica").start()
+
+
+def start_delivery() -> None:
+    if SEND_PIPELINE_WORKERS > 0:
+        set_send_pipeline(SendPipeline(SEND_PIPELINE_WORKERS).start())
+
+
+async def close_delivery() -> None:
+    pipeline = get_send_pipeline()
+    if pipeline is not None:
+        await pipeline.close()
+        set_send_pipeline(None)
+        logging.info("Send pipeline: %s", pipeline.stats.as_dict())
+    logging.info("Card render cache: %s", card_render_cache_stats().as_dict())
+    logging.info("Export block render cache: %s", wish_block_cache_stats().as_dict())
+    if outbound is not None:
+        logging.info("Outbound scheduler: %s", outbound.stats.as_dict())
+        await outbound.close()
+
+
+async def run_in_memory() -> None:
+    logging.warning("STORAGE_BACKEND=memory: данные хранятся в памяти и пропадут после перезапуска.")
+    register_routes(dp, InMemoryStorage())
+    start_delivery()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await close_delivery()
+
+
+async def migrate_images_in_background(storage: Storage) -> None:
+    # Legacy inline photos stay readable until moved, so polling does not wait for this.
+    try:
+        moved = await storage.migrate_inline_images()
+    except Exception:
+        logging.exception("Moving inline images to the blob store failed; it is retried on the next start.")
+        return
+    if moved:
+        logging.info("Moved %s inline images to the blob store.", moved)
+    try:
+        removed = await storage.sweep_orphan_images()
+    except Exception:
+        logging.exception("Sweeping unused images failed; it is retried on the next start.")
+        return
+    if removed:
+        logging.info("Removed %s unused images from the blob store.", removed)
 
 
 async def main() -> None:
+    if STORAGE_BACKEND == "memory":
+        await run_in_memory()
+        return
+
     pool = await create_pool()
-    storage = Storage(pool)
+    replica_pool = await create_replica_pool()
+    storage = Storage(pool, replica_pool=replica_pool)
+    image_migration: asyncio.Task[None] | None = None
     try:
-        await storage.ensure_session_schema()
+        await run_migrations(pool)
+        image_migration = asyncio.create_task(migrate_images_in_background(storage))
         register_routes(dp, storage)
+        start_delivery()
         await dp.start_polling(bot)
     finally:
+        if image_migration is not None:
+            image_migration.cancel()
+            await asyncio.gather(image_migration, return_exceptions=True)
+        await close_delivery()
+        logging.info("Session cache: %s", storage.session_cache_stats().as_dict())
+        logging.info("Wish list cache: %s", storage.wish_list_cache_stats().as_dict())
+        logging.info("Primary pool: %s", pool.stats.as_dict())
+        if replica_pool is not None:
+            logging.info("Replica pool: %s", replica_pool.stats.as_dict())
+            await replica_pool.close()
         await pool.close()
 
 
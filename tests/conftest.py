@@ -0,0 +1,96 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+
+import asyncpg
+import pytest
+
+from core.blob_store import BlobStore
+from core.config import build_db_config
+from core.database_setup import run_migrations
+from core.memory_storage import InMemoryStorage
+from core.storage import Storage
+
+
+class MemoryBackend:
+    def __init__(self) -> None:
+        self.storage = InMemoryStorage()
+
+    async def seed_inline_image(self, user_id: int, wish_id: int, data: bytes) -> None:
+        pytest.skip("Only PostgreSQL rows written before the blob store can hold inline photos.")
+
+
+class PostgresBackend:
+    def __init__(self, pool: asyncpg.Pool, blob_root: Path) -> None:
+        self.pool = pool
+        self.blob_store = BlobStore(blob_root)
+        self.storage = Storage(pool, blob_store=self.blob_store)
+
+    async def seed_inline_image(self, user_id: int, wish_id: int, data: bytes) -> None:
+        """Turn a wish into an unmigrated row that keeps its photo inline."""
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                "UPDATE wishes SET image = $3, image_hash = NULL, image_url = NULL WHERE user_id = $1 AND id = $2",
+                user_id,
+                wish_id,
+                data,
+            )
+        # The row changed behind the storage's back: start over with empty caches.
+        self.storage = Storage(self.pool, blob_store=self.blob_store)
+
+
+Backend = MemoryBackend | PostgresBackend
+Scenario = Callable[[Backend], Awaitable[None]]
+
+
+async def _probe_postgres() -> str | None:
+    try:
+        conn = await asyncpg.connect(**build_db_config(), timeout=5)
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as exc:
+        return f"PostgreSQL is not available: {exc}"
+    await conn.close()
+    return None
+
+
+@pytest.fixture(scope="session")
+def postgres_unavailable() -> str | None:
+    return asyncio.run(_probe_postgres())
+
+
+@asynccontextmanager
+async def _postgres_backend(blob_root: Path) -> AsyncIterator[PostgresBackend]:
+    # Every test migrates a throwaway schema, so the configured database is left untouched.
+    schema = f"test_{uuid.uuid4().hex}"
+    config = build_db_config()
+    admin = await asyncpg.connect(**config)
+    try:
+        await admin.execute(f'CREATE SCHEMA "{schema}"')
+        pool = await asyncpg.create_pool(**config, min_size=1, max_size=2, server_settings={"search_path": schema})
+        try:
+            await run_migrations(pool)
+            yield PostgresBackend(pool, blob_root)
+        finally:
+            await pool.close()
+    finally:
+        await admin.execute(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+        await admin.close()
+
+
+@pytest.fixture(params=["memory", "postgres"])
+def run_scenario(request: pytest.FixtureRequest, tmp_path: Path) -> Callable[[Scenario], None]:
+    """Run an async scenario against one storage backend in a fresh event loop."""
+    if request.param == "postgres":
+        reason = request.getfixturevalue("postgres_unavailable")
+        if reason:
+            pytest.skip(reason)
+
+    async def _run(scenario: Scenario) -> None:
+        if request.param == "memory":
+            await scenario(MemoryBackend())
+            return
+        async with _postgres_backend(tmp_path) as backend:
+            await scenario(backend)
+
+    return lambda scenario: asyncio.run(_run(scenario))
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from aiogram.methods import DeleteMessages, EditMessageReplyMarkup, EditMessageText, SendMessage
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from bot.callbacks.delete_callbacks import DELETED_STUB_TEXT, _remove_wish_messages
+from bot.message_registry import DELETE_WINDOW_SECONDS, message_registry
+from ui.keyboards import build_delete_confirm_keyboard, build_numbered_actions_keyboard, wish_ids_in_keyboard
+
+CHAT = 101
+WISH = 7
+OTHER_WISH = 8
+
+
+class RecordingBot:
+    """Stands in for aiogram's Bot: records every method call instead of sending it."""
+
+    def __init__(self) -> None:
+        self.calls: list = []
+
+    async def __call__(self, method, request_timeout=None):
+        self.calls.append(method)
+        return True
+
+    async def delete_messages(self, chat_id, message_ids):
+        return await self(DeleteMessages(chat_id=chat_id, message_ids=message_ids))
+
+    async def edit_message_reply_markup(self, **kwargs):
+        return await self(EditMessageReplyMarkup(**kwargs))
+
+    async def edit_message_text(self, **kwargs):
+        return await self(EditMessageText(**kwargs))
+
+    def of(self, method_type) -> list:
+        return [call for call in self.calls if isinstance(call, method_type)]
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    message_registry.clear()
+    yield
+    message_registry.clear()
+
+
+def _pressed(bot: RecordingBot, message_id: int, reply_markup, *, sent_at: float) -> CallbackQuery:
+    user = User(id=CHAT, is_bot=False, first_name="Owner")
+    message = Message(
+        message_id=message_id,
+        date=datetime.fromtimestamp(sent_at, tz=timezone.utc),
+        chat=Chat(id=CHAT, type="private"),
+        text="card",
+        reply_markup=reply_markup,
+    )
+    callback = CallbackQuery(id="1", from_user=user, chat_instance="chat", message=message, data=f"delete_confirm:{WISH}")
+    return callback.as_(bot)
+
+
+def test_known_cards_are_deleted_with_the_pressed_card():
+    async def scenario():
+        bot = RecordingBot()
+        now = time.time()
+        message_registry.record(CHAT, WISH, [10, 11], sent_at=now)
+        await _remove_wish_messages(_pressed(bot, 11, build_delete_confirm_keyboard(WISH, in_place=True), sent_at=now), WISH)
+        [deleted] = bot.of(DeleteMessages)
+        assert deleted.message_ids == [10, 11]
+        assert bot.of(EditMessageText) == [] and bot.of(SendMessage) == []
+
+    asyncio.run(scenario())
+
+
+def test_pressed_card_becomes_a_stub_when_nothing_else_is_known():
+    async def scenario():
+        bot = RecordingBot()
+        await _remove_wish_messages(
+            _pressed(bot, 11, build_delete_confirm_keyboard(WISH, in_place=True), sent_at=time.time()), WISH
+        )
+        assert bot.of(DeleteMessages) == []
+        [stub] = bot.of(EditMessageText)
+        assert (stub.message_id, stub.text) == (11, DELETED_STUB_TEXT)
+
+    asyncio.run(scenario())
+
+
+def test_cards_past_the_delete_window_lose_their_buttons_instead():
+    async def scenario():
+        bot = RecordingBot()
+        old = time.time() - DELETE_WINDOW_SECONDS - 60
+        message_registry.record(CHAT, WISH, [10, 11], sent_at=old)
+        await _remove_wish_messages(_pressed(bot, 11, build_delete_confirm_keyboard(WISH, in_place=True), sent_at=old), WISH)
+        assert bot.of(DeleteMessages) == []
+        [stripped] = bot.of(EditMessageReplyMarkup)
+        assert (stripped.message_id, stripped.reply_markup) == (10, None)
+        [stub] = bot.of(EditMessageText)
+        assert stub.message_id == 11
+
+    asyncio.run(scenario())
+
+
+def test_shared_keyboards_drop_only_the_deleted_wish():
+    async def scenario():
+        bot = RecordingBot()
+        now = time.time()
+        album_actions = build_numbered_actions_keyboard([(1, WISH), (2, OTHER_WISH)])
+        message_registry.record_shared(CHAT, 20, [WISH, OTHER_WISH], album_actions)
+        message_registry.record(CHAT, WISH, [19], sent_at=now)
+        await _remove_wish_messages(_pressed(bot, 30, build_delete_confirm_keyboard(WISH), sent_at=now), WISH)
+
+        [stripped] = bot.of(EditMessageReplyMarkup)
+        assert stripped.message_id == 20 and wish_ids_in_keyboard(stripped.reply_markup) == {OTHER_WISH}
+        [deleted] = bot.of(DeleteMessages)
+        assert deleted.message_ids == [19, 30]
+        assert message_registry.pop_shared(CHAT, WISH) == {}
+        assert set(message_registry.pop_shared(CHAT, OTHER_WISH)) == {20}
+
+    asyncio.run(scenario())
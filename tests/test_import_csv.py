@@ -0,0 +1,26 @@
+import io
+
+from core.formatting import compose_export_csv, parse_import_csv
+from core.models import Wish
+
+
+def _parse(text: str) -> list:
+    return list(parse_import_csv(io.StringIO(text, newline="")))
+
+
+def test_exported_list_imports_back():
+    wishes = [
+        Wish(title="Н" * 130, link="https://example.com", category="Книги", description="в твёрдой обложке", priority=5),
+        Wish(title="Кофе", priority=2),
+    ]
+    parsed = _parse(compose_export_csv(wishes))
+    assert [error for _, _, error in parsed] == [None, None]
+    assert [(wish.title, wish.link, wish.category, wish.priority) for _, wish, _ in parsed] == [
+        ("Н" * 130, "https://example.com", "Книги", 5),
+        ("Кофе", None, None, 2),
+    ]
+
+
+def test_bad_rows_are_reported_without_stopping_the_file():
+    parsed = _parse("Книга,ftp://example.com,,,\n,,,,\nКофе,,,,9\nЧай,,,,\n")
+    assert [(line, error is None) for line, _, error in parsed] == [(1, False), (3, False), (4, True)]
@@ -0,0 +1,42 @@
+import io
+import json
+
+from core.legacy_import import iter_legacy_records
+
+
+def _records(data) -> list:
+    handle = io.StringIO(json.dumps(data))
+    return [(owner, record["title"]) for owner, record in iter_legacy_records(handle)]
+
+
+def test_top_level_user_ids_own_their_arrays():
+    data = {"101": [{"title": "Книга"}, {"title": "Кофе"}], "-5": [{"title": "Чай"}]}
+    assert _records(data) == [("101", "Книга"), ("101", "Кофе"), ("-5", "Чай")]
+
+
+def test_users_container_holds_owner_ids():
+    data = {"version": 2, "users": {"101": {"wishes": [{"title": "Книга"}]}, "202": {"wishes": []}}}
+    assert _records(data) == [("101", "Книга")]
+
+
+def test_numeric_keys_below_an_owner_are_wish_ids_not_owners():
+    data = {
+        "123": {"wishes": {"1": {"title": "Книга", "priority": 7}, "2": {"title": "Кофе"}}},
+        "users": {"456": {"wishes": {"3": {"title": "Чай"}}}},
+    }
+    assert _records(data) == [("123", "Книга"), ("123", "Кофе"), ("456", "Чай")]
+
+
+def test_arrays_without_an_owner_are_reported_unowned():
+    records = list(iter_legacy_records(io.StringIO(json.dumps({"meta": {"7": [{"title": "x"}]}}))))
+    assert records == [(None, {"title": "x"})]
+
+
+def test_scalars_split_across_read_chunks_decode_whole():
+    # Skipped metadata and array items are decoded one scalar at a time, so with a
+    # tiny chunk size every number and literal ends up cut at some buffer boundary.
+    data = {"version": 12345, "ratio": -1.5e3, "legacy": True, "beta": False, "note": None, "101": [67890, True, None]}
+    text = json.dumps(data)
+    for chunk_size in range(1, 8):
+        records = list(iter_legacy_records(io.StringIO(text), chunk_size=chunk_size))
+        assert records == [("101", 67890), ("101", True), ("101", None)], chunk_size
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from aiogram.methods import AnswerCallbackQuery, DeleteMessage, SendMessage
+
+from bot.send_pipeline import ChatOrderMiddleware, SendPipeline, deliver, set_send_pipeline
+
+CHAT = 101
+OTHER_CHAT = 202
+
+
+@pytest.fixture
+def pipeline():
+    instance = SendPipeline(workers=2)
+    set_send_pipeline(instance)
+    yield instance
+    set_send_pipeline(None)
+
+
+def _recorder(log: list, label: str, delay: float = 0.0):
+    async def job() -> str:
+        await asyncio.sleep(delay)
+        log.append(label)
+        return label
+
+    return job
+
+
+def test_jobs_of_one_chat_run_in_order_while_chats_run_in_parallel(pipeline):
+    async def scenario():
+        pipeline.start()
+        log: list = []
+        await deliver(CHAT, _recorder(log, "list", delay=0.05))
+        await deliver(CHAT, _recorder(log, "pager"))
+        await deliver(OTHER_CHAT, _recorder(log, "other"))
+        await pipeline.close()
+        assert log == ["other", "list", "pager"]
+        assert pipeline.stats.completed == 3 and pipeline.stats.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_direct_calls_wait_behind_the_chats_queued_jobs(pipeline):
+    async def scenario():
+        pipeline.start()
+        log: list = []
+        middleware = ChatOrderMiddleware()
+
+        async def make_request(bot, method):
+            log.append(type(method).__name__)
+            return "sent"
+
+        await deliver(CHAT, _recorder(log, "list", delay=0.05))
+        answer = middleware(make_request, None, AnswerCallbackQuery(callback_query_id="1"))
+        reply = middleware(make_request, None, SendMessage(chat_id=CHAT, text="Готово"))
+        assert await asyncio.gather(answer, reply) == ["sent", "sent"]
+        assert log == ["AnswerCallbackQuery", "list", "SendMessage"]
+        await pipeline.close()
+
+    asyncio.run(scenario())
+
+
+def test_idle_chats_and_edits_do_not_wait_for_busy_workers(pipeline):
+    async def scenario():
+        pipeline.start()
+        log: list = []
+        middleware = ChatOrderMiddleware()
+
+        async def make_request(bot, method):
+            log.append(type(method).__name__)
+            return "sent"
+
+        # Both workers are busy with long lists.
+        await deliver(CHAT, _recorder(log, "list", delay=0.05))
+        await deliver(OTHER_CHAT, _recorder(log, "other list", delay=0.05))
+        await middleware(make_request, None, SendMessage(chat_id=303, text="Привет"))
+        await middleware(make_request, None, DeleteMessage(chat_id=CHAT, message_id=1))
+        assert log == ["SendMessage", "DeleteMessage"]
+        await pipeline.close()
+
+    asyncio.run(scenario())
+
+
+def test_direct_call_errors_reach_the_caller(pipeline):
+    async def scenario():
+        pipeline.start()
+        middleware = ChatOrderMiddleware()
+
+        async def make_request(bot, method):
+            raise ConnectionError("network is down")
+
+        await deliver(CHAT, _recorder([], "list", delay=0.01))
+        with pytest.raises(ConnectionError):
+            await middleware(make_request, None, SendMessage(chat_id=CHAT, text="Готово"))
+        await pipeline.close()
+        assert pipeline.stats.failed == 0
+
+    asyncio.run(scenario())
+
+
+def test_without_a_pipeline_everything_runs_inline():
+    async def scenario():
+        log: list = []
+        await deliver(CHAT, _recorder(log, "list"))
+        assert log == ["list"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from core.blob_store import BlobStore
+from core.storage import Storage
+
+OWNER = 101
+
+
+class SlowSessionPool:
+    """Pool stand-in whose session reads return the stored row only once released."""
+
+    def __init__(self) -> None:
+        self.is_active = True
+        self.release_reads = asyncio.Event()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetchrow(self, query, user_id):
+        is_active = self.is_active
+        await self.release_reads.wait()
+        return {"is_active": is_active}
+
+    async def execute(self, query, user_id, is_active):
+        self.is_active = is_active
+
+
+def test_a_read_overtaken_by_a_write_does_not_fill_the_cache(tmp_path):
+    async def scenario():
+        pool = SlowSessionPool()
+        storage = Storage(pool, blob_store=BlobStore(tmp_path))
+
+        stale_read = asyncio.create_task(storage.is_session_active(OWNER))
+        await asyncio.sleep(0)
+        await storage.mark_session_inactive(OWNER)
+        pool.release_reads.set()
+
+        assert await stale_read is True
+        assert await storage.is_session_active(OWNER) is False
+        assert storage.session_cache_stats().hits == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,295 @@
+"""
+Behaviour shared by every StorageProtocol backend.
+
+Each test runs against InMemoryStorage and against Storage on a real PostgreSQL
+(skipped when PG* settings do not point at a reachable server).
+"""
+
+import pytest
+
+from core.models import Wish
+
+OWNER = 101
+STRANGER = 202
+
+
+async def _add(storage, user_id: int, title: str, **fields) -> Wish:
+    await storage.add_wish(user_id, Wish(title=title, **fields))
+    page = await storage.list_wishes_page(user_id, limit=1000)
+    return next(wish for wish in reversed(page.items) if wish.title == title)
+
+
+def test_add_wish_is_visible_only_to_its_owner(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        wish = await _add(storage, OWNER, "Книга", link="https://example.com", category="books", priority=4)
+
+        assert wish.id is not None
+        assert wish.user_id == OWNER
+        assert (wish.link, wish.category, wish.priority, wish.has_image) == ("https://example.com", "books", 4, False)
+        assert await storage.find_wish(OWNER, wish.id) == wish
+        assert await storage.find_wish(STRANGER, wish.id) is None
+
+    run_scenario(scenario)
+
+
+def test_patch_wish_returns_the_updated_row(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        wish = await _add(storage, OWNER, "Наушники", priority=2)
+
+        updated = await storage.patch_wish(OWNER, wish.id, title="Беспроводные наушники", priority=5, link=None)
+        assert updated is not None
+        assert (updated.id, updated.user_id) == (wish.id, OWNER)
+        assert (updated.title, updated.priority, updated.link) == ("Беспроводные наушники", 5, None)
+        assert await storage.find_wish(OWNER, wish.id) == updated
+
+        with_photo = await storage.patch_wish(OWNER, wish.id, image_url="file-1", image_bytes=b"photo")
+        assert with_photo.has_image and with_photo.image_url == "file-1"
+        assert bytes(await storage.load_wish_image(OWNER, wish.id)) == b"photo"
+
+        cleared = await storage.clear_wish_photo(OWNER, wish.id)
+        assert not cleared.has_image and cleared.image_url is None and cleared.image_hash is None
+        assert await storage.load_wish_image(OWNER, wish.id) is None
+
+        assert await storage.patch_wish(STRANGER, wish.id, title="чужое") is None
+        assert await storage.patch_wish(OWNER, wish.id) == cleared
+        with pytest.raises(ValueError):
+            await storage.patch_wish(OWNER, wish.id, has_image=True)
+
+    run_scenario(scenario)
+
+
+def test_delete_wish_reports_whether_a_row_was_removed(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        wish = await _add(storage, OWNER, "Велосипед")
+
+        assert await storage.delete_wish(STRANGER, wish.id) is False
+        assert await storage.delete_wish(OWNER, wish.id) is True
+        assert await storage.delete_wish(OWNER, wish.id) is False
+        assert await storage.find_wish(OWNER, wish.id) is None
+
+    run_scenario(scenario)
+
+
+def test_keyset_pages_walk_the_list_in_both_directions(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        specs = [
+            ("a", None, 3),
+            ("b", "books", 1),
+            ("c", "games", 5),
+            ("d", "books", 5),
+            ("e", None, 3),
+            ("f", "games", 2),
+            ("g", "books", 5),
+        ]
+        for title, category, priority in specs:
+            await storage.add_wish(OWNER, Wish(title=title, category=category, priority=priority))
+        await storage.add_wish(STRANGER, Wish(title="x", priority=3))
+        # Category ascending (none first), then priority descending, then insertion order.
+        expected = ["a", "e", "d", "g", "b", "c", "f"]
+
+        pages = [await storage.list_wishes_page(OWNER, limit=3)]
+        while pages[-1].has_next:
+            pages.append(await storage.list_wishes_page(OWNER, after=pages[-1].items[-1].page_key(), limit=3))
+        assert [[wish.title for wish in page.items] for page in pages] == [expected[0:3], expected[3:6], expected[6:]]
+        assert [page.has_prev for page in pages] == [False, True, True]
+        assert [page.has_next for page in pages] == [True, True, False]
+        assert all(wish.user_id == OWNER for page in pages for wish in page.items)
+
+        backwards = [await storage.list_wishes_page(OWNER, before=pages[-1].items[0].page_key(), limit=3)]
+        while backwards[-1].has_prev:
+            backwards.append(await storage.list_wishes_page(OWNER, before=backwards[-1].items[0].page_key(), limit=3))
+        assert [[wish.title for wish in page.items] for page in backwards] == [expected[3:6], expected[0:3]]
+        assert [page.has_next for page in backwards] == [True, True]
+
+        with pytest.raises(ValueError):
+            await storage.list_wishes_page(OWNER, after=pages[0].items[0].page_key(), before=pages[1].items[0].page_key())
+
+    run_scenario(scenario)
+
+
+def test_categories_group_trimmed_names_and_keep_other_whitespace(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        specs = [
+            ("Книги", 2),
+            ("  Книги ", 5),
+            ("\tКниги\r\n", 1),
+            ("\u00a0Книги", 3),
+            ("книги", 4),
+            ("   ", 5),
+            ("🎮 Игры", 2),
+            (None, 5),
+        ]
+        for index, (category, priority) in enumerate(specs):
+            await storage.add_wish(OWNER, Wish(title=f"w{index}", category=category, priority=priority))
+
+        categories = await storage.collect_categories(OWNER)
+        summary = {category.name: (category.count, category.max_priority) for category in categories}
+        # Only spaces, tabs and line breaks are trimmed; a no-break space is part of the name.
+        assert summary == {
+            "Книги": (3, 5),
+            "\u00a0Книги": (1, 3),
+            "книги": (1, 4),
+            "🎮 Игры": (1, 2),
+        }
+
+    run_scenario(scenario)
+
+
+def test_mixed_case_categories_sort_the_same_on_every_backend(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        for category in ["books", "Games", "apps", "ёлки", "Ёлки", "Яблоки", "Apps", None]:
+            await storage.add_wish(OWNER, Wish(title=category or "none", category=category, priority=3))
+
+        # Case-insensitive first, then by code point, whatever the database locale is.
+        expected = [None, "Apps", "apps", "books", "Games", "Яблоки", "Ёлки", "ёлки"]
+        pages = [await storage.list_wishes_page(OWNER, limit=3)]
+        while pages[-1].has_next:
+            pages.append(await storage.list_wishes_page(OWNER, after=pages[-1].items[-1].page_key(), limit=3))
+        assert [wish.category for page in pages for wish in page.items] == expected
+        assert [wish.category for wish in await storage.list_wishes(OWNER)] == expected
+
+        back = await storage.list_wishes_page(OWNER, before=pages[-1].items[0].page_key(), limit=3)
+        assert [wish.category for wish in back.items] == expected[3:6]
+
+        names = [category.name for category in await storage.collect_categories(OWNER)]
+        assert names == expected[1:]
+
+    run_scenario(scenario)
+
+
+def test_page_reflects_writes_made_after_it_was_read(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        wish = await _add(storage, OWNER, "Старое название")
+        await storage.list_wishes_page(OWNER)
+
+        await storage.patch_wish(OWNER, wish.id, title="Новое название")
+        assert [item.title for item in (await storage.list_wishes_page(OWNER)).items] == ["Новое название"]
+
+        await storage.delete_wish(OWNER, wish.id)
+        page = await storage.list_wishes_page(OWNER)
+        assert (page.items, page.has_prev, page.has_next) == ([], False, False)
+
+    run_scenario(scenario)
+
+
+def test_pages_hand_out_wishes_the_caller_may_change(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        await _add(storage, OWNER, "Фотоаппарат", image=b"stored photo")
+
+        first = await storage.list_wishes_page(OWNER)
+        first.items[0].image_url = "never-stored"
+        first.items.clear()
+
+        again = await storage.list_wishes_page(OWNER)
+        assert [(wish.title, wish.image_url) for wish in again.items] == [("Фотоаппарат", None)]
+
+    run_scenario(scenario)
+
+
+def test_remember_image_file_id_only_fills_the_photo_it_was_uploaded_from(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        wish = await _add(storage, OWNER, "Фотоаппарат", image=b"stored photo")
+        assert wish.has_image and wish.image_hash is not None
+
+        assert await storage.remember_image_file_id(OWNER, wish.id, "file-x", image_hash="0" * 64) is False
+        assert await storage.remember_image_file_id(STRANGER, wish.id, "file-x", image_hash=wish.image_hash) is False
+        assert await storage.remember_image_file_id(OWNER, wish.id, "file-1", image_hash=wish.image_hash) is True
+        assert (await storage.find_wish(OWNER, wish.id)).image_url == "file-1"
+        assert await storage.remember_image_file_id(OWNER, wish.id, "file-2", image_hash=wish.image_hash) is False
+
+        plain = await _add(storage, OWNER, "Без фото")
+        assert await storage.remember_image_file_id(OWNER, plain.id, "file-3", image_hash=None) is False
+
+    run_scenario(scenario)
+
+
+def test_remember_image_file_id_accepts_unmigrated_inline_photos(run_scenario):
+    async def scenario(backend):
+        wish = await _add(backend.storage, OWNER, "Старое фото")
+        await backend.seed_inline_image(OWNER, wish.id, b"inline photo")
+        storage = backend.storage
+
+        legacy = await storage.find_wish(OWNER, wish.id)
+        assert legacy.has_image and legacy.image_hash is None
+        assert bytes(await storage.load_wish_image(OWNER, wish.id)) == b"inline photo"
+
+        assert await storage.remember_image_file_id(OWNER, wish.id, "file-1", image_hash="0" * 64) is False
+        assert await storage.remember_image_file_id(OWNER, wish.id, "file-1", image_hash=None) is True
+        assert (await storage.find_wish(OWNER, wish.id)).image_url == "file-1"
+
+        replaced = await storage.patch_wish(OWNER, wish.id, image_url=None, image_bytes=b"new photo")
+        assert replaced.image_hash is not None
+        assert bytes(await storage.load_wish_image(OWNER, wish.id)) == b"new photo"
+
+    run_scenario(scenario)
+
+
+def test_inline_photos_move_to_the_blob_store_across_batches(run_scenario):
+    async def scenario(backend):
+        first = await _add(backend.storage, OWNER, "Первое")
+        second = await _add(backend.storage, OWNER, "Второе")
+        await backend.seed_inline_image(OWNER, first.id, b"shared photo")
+        await backend.seed_inline_image(OWNER, second.id, b"shared photo")
+        storage = backend.storage
+
+        assert await storage.migrate_inline_images(batch_size=1) == 2
+        for wish_id in (first.id, second.id):
+            migrated = await storage.find_wish(OWNER, wish_id)
+            assert migrated.image_hash is not None
+            assert bytes(await storage.load_wish_image(OWNER, wish_id)) == b"shared photo"
+        assert await storage.migrate_inline_images() == 0
+
+    run_scenario(scenario)
+
+
+def test_shared_photo_outlives_the_wishes_that_drop_it(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        first = await _add(storage, OWNER, "Кружка", image=b"same photo")
+        second = await _add(storage, STRANGER, "Кружка", image=b"same photo")
+        assert first.image_hash == second.image_hash
+
+        assert await storage.delete_wish(OWNER, first.id) is True
+        assert bytes(await storage.load_wish_image(STRANGER, second.id)) == b"same photo"
+
+        replaced = await storage.patch_wish(STRANGER, second.id, image_bytes=b"other photo")
+        assert replaced.image_hash != second.image_hash
+        assert bytes(await storage.load_wish_image(STRANGER, second.id)) == b"other photo"
+
+        again = await _add(storage, OWNER, "Кружка снова", image=b"same photo")
+        assert bytes(await storage.load_wish_image(OWNER, again.id)) == b"same photo"
+
+    run_scenario(scenario)
+
+
+def test_search_matches_word_prefixes_of_title_and_description(run_scenario):
+    async def scenario(backend):
+        storage = backend.storage
+        await storage.add_wish(OWNER, Wish(title="Беспроводные наушники", priority=3))
+        await storage.add_wish(OWNER, Wish(title="Кроссовки", description="Для бега, под наушники", priority=4))
+        await storage.add_wish(OWNER, Wish(title="Wi-Fi роутер", priority=2))
+        await storage.add_wish(STRANGER, Wish(title="Наушники", priority=5))
+
+        async def titles(query: str) -> set[str]:
+            return {wish.title for wish in await storage.search_wishes(OWNER, query)}
+
+        assert await titles("наушн") == {"Беспроводные наушники", "Кроссовки"}
+        assert await titles("НАУШНИКИ бег") == {"Кроссовки"}
+        assert await titles("fi") == {"Wi-Fi роутер"}
+        assert await titles("wi-fi") == {"Wi-Fi роутер"}
+        assert await titles("телевизор") == set()
+        assert await titles("  ,;! ") == set()
+        assert await titles("_") == set()
+        assert len(await storage.search_wishes(OWNER, "наушн", limit=1)) == 1
+        assert all(wish.user_id == OWNER for wish in await storage.search_wishes(OWNER, "наушн"))
+
+    run_scenario(scenario)
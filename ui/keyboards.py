@@ -1,6 +1,10 @@
+from dataclasses import dataclass
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from core.cache import CacheStats, TTLCache
+from core.config import RENDER_CACHE_SIZE
 from core.formatting import category_to_emoji, escape_html_text
 from core.models import Wish
 
@@ -9,6 +13,8 @@ ADD_BUTTON = "➕ Добавить"
 SETTINGS_BUTTON = "⚙️ Настройки"
 PARTNER_LIST_BUTTON = "💞 Список партнёра"
 
+MAX_CAPTION_LENGTH = 1024
+
 
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
     keyboard = [
@@ -66,6 +72,34 @@ def build_wish_card(wish: Wish) -> str:
     return "\n".join(lines)
 
 
+@dataclass(frozen=True, slots=True)
+class RenderedCard:
+    text: str
+    fits_caption: bool
+
+
+# Keyed by the wish id plus every field the card shows, so an edited wish simply
+# misses; entries never go stale and only need the LRU bound.
+_card_cache: TTLCache[tuple, RenderedCard] = TTLCache(max(RENDER_CACHE_SIZE, 1), float("inf"))
+
+
+def render_wish_card(wish: Wish) -> RenderedCard:
+    """Cached ``build_wish_card`` together with whether it fits into a photo caption."""
+    key = (wish.id, wish.title, wish.category, wish.description, wish.link, wish.priority)
+    cached = _card_cache.get(key) if wish.id is not None and RENDER_CACHE_SIZE > 0 else None
+    if cached is not None:
+        return cached
+    text = build_wish_card(wish)
+    rendered = RenderedCard(text=text, fits_caption=len(text) <= MAX_CAPTION_LENGTH)
+    if wish.id is not None and RENDER_CACHE_SIZE > 0:
+        _card_cache.set(key, rendered)
+    return rendered
+
+
+def card_render_cache_stats() -> CacheStats:
+    return _card_cache.stats
+
+
 def build_wish_actions_keyboard(wish_id: int) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(
@@ -75,6 +109,89 @@ def build_wish_actions_keyboard(wish_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def build_numbered_actions_keyboard(entries: list[tuple[int, int]]) -> InlineKeyboardMarkup:
+    """Edit/delete buttons for several wishes at once; entries are (number shown in the list, wish id)."""
+    builder = InlineKeyboardBuilder()
+    for number, wish_id in entries:
+        builder.row(
+            InlineKeyboardButton(text=f"✏️ {number}", callback_data=f"edit:card:{wish_id}"),
+            InlineKeyboardButton(text=f"❌ {number}", callback_data=f"delete:{wish_id}"),
+        )
+    return builder.as_markup()
+
+
+def _pager_buttons(scope: str, first_id: int, last_id: int, *, has_prev: bool, has_next: bool) -> list[InlineKeyboardButton]:
+    buttons: list[InlineKeyboardButton] = []
+    if has_prev:
+        buttons.append(InlineKeyboardButton(text="⬅️ Предыдущие", callback_data=f"list:{scope}:prev:{first_id}"))
+    if has_next:
+        buttons.append(InlineKeyboardButton(text="Следующие ➡️", callback_data=f"list:{scope}:next:{last_id}"))
+    return buttons
+
+
+def wish_ids_in_keyboard(markup: InlineKeyboardMarkup | None) -> set[int]:
+    """Ids of the wishes an inline keyboard acts on (navigation buttons without an id are skipped)."""
+    ids: set[int] = set()
+    if markup is None:
+        return ids
+    for row in markup.inline_keyboard:
+        for button in row:
+            parts = (button.callback_data or "").split(":")
+            wish_id = next((part for part in parts[1:] if part.isdigit()), None)
+            if parts[0] in {"edit", "delete", "delete_confirm", "delete_cancel"} and wish_id is not None:
+                ids.add(int(wish_id))
+    return ids
+
+
+def build_list_pager(scope: str, first_id: int, last_id: int, *, has_prev: bool, has_next: bool) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.row(*_pager_buttons(scope, first_id, last_id, has_prev=has_prev, has_next=has_next))
+    return builder.as_markup()
+
+
+def build_compact_wish_line(number: int, wish: Wish) -> str:
+    title_line = render_wish_card(wish).text.split("\n", 1)[0]
+    parts = [f"{number}. {title_line}"]
+    if wish.priority is not None:
+        parts.append(f"⭐{wish.priority}")
+    if wish.image_url or wish.has_image:
+        parts.append("🖼️")
+    return " · ".join(parts)
+
+
+def build_compact_list_keyboard(
+    scope: str,
+    entries: list[tuple[int, int]],
+    *,
+    first_id: int,
+    last_id: int,
+    has_prev: bool,
+    has_next: bool,
+) -> InlineKeyboardMarkup | None:
+    """Numbered buttons opening each wish's edit card, followed by the pager row."""
+    builder = InlineKeyboardBuilder()
+    for number, wish_id in entries:
+        builder.button(text=str(number), callback_data=f"edit:card:{wish_id}")
+    builder.adjust(5)
+    pager = _pager_buttons(scope, first_id, last_id, has_prev=has_prev, has_next=has_next)
+    if pager:
+        builder.row(*pager)
+    if not entries and not pager:
+        return None
+    return builder.as_markup()
+
+
+def build_delete_confirm_keyboard(wish_id: int, *, in_place: bool = False) -> InlineKeyboardMarkup:
+    # In place the "back" button has to restore the card's own keyboard, so it carries the id.
+    back_data = f"delete_cancel:{wish_id}" if in_place else "cancel"
+    builder = InlineKeyboardBuilder()
+    builder.row(
+        InlineKeyboardButton(text="✅ Удалить", callback_data=f"delete_confirm:{wish_id}"),
+        InlineKeyboardButton(text="⬅️ Назад", callback_data=back_data),
+    )
+    return builder.as_markup()
+
+
 def build_edit_menu(item_id: int, *, has_photo: bool) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(InlineKeyboardButton(text="⭐ Приоритет", callback_data=f"edit:priority:{item_id}"))